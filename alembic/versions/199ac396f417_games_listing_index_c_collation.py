@@ -0,0 +1,31 @@
+"""games listing index in C collation
+
+Revision ID: 199ac396f417
+Revises: fd6a1bd4aaa7
+Create Date: 2026-10-18 22:05:43.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '199ac396f417'
+down_revision: Union[str, Sequence[str], None] = 'fd6a1bd4aaa7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Листинг сортирует name в collation "C" — индекс в collation базы ему больше не подходит
+    op.drop_index('ix_games_name_year_id', table_name='games')
+    op.create_index('ix_games_name_c_year_id', 'games', [sa.text('name COLLATE "C"'), 'year', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_games_name_c_year_id', table_name='games')
+    op.create_index('ix_games_name_year_id', 'games', ['name', 'year', 'id'], unique=False)
@@ -0,0 +1,46 @@
+"""game search vector and trigram index
+
+Revision ID: 4a8e152353ea
+Revises: a45061c11b2d
+Create Date: 2026-10-18 13:41:07.532190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8e152353ea'
+down_revision: Union[str, Sequence[str], None] = 'a45061c11b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('games', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('ix_games_search_vector', 'games', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_games_name_trgm', 'games', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_games_name_trgm', table_name='games')
+    op.drop_index('ix_games_search_vector', table_name='games')
+    op.drop_column('games', 'search_vector')
@@ -0,0 +1,51 @@
+"""dashboard materialized views
+
+Revision ID: 9c00f6661f6b
+Revises: 4a8e152353ea
+Create Date: 2026-10-18 17:12:40.215731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c00f6661f6b'
+down_revision: Union[str, Sequence[str], None] = '4a8e152353ea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_games_per_platform AS
+        SELECT p.id AS platform_id, p.name AS platform, count(gp.game_id)::integer AS games
+        FROM platforms p
+        LEFT JOIN game_platform gp ON gp.platform_id = p.id
+        GROUP BY p.id, p.name
+    """)
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_catalog_growth_monthly AS
+        SELECT date_trunc('month', created_at)::date AS month, count(*)::integer AS games
+        FROM games
+        GROUP BY 1
+    """)
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_user_signups_daily AS
+        SELECT date_trunc('day', created_at)::date AS day, count(*)::integer AS users
+        FROM users
+        GROUP BY 1
+    """)
+    # Уникальные индексы обязательны для REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index('ux_mv_games_per_platform_platform_id', 'mv_games_per_platform', ['platform_id'], unique=True)
+    op.create_index('ux_mv_catalog_growth_monthly_month', 'mv_catalog_growth_monthly', ['month'], unique=True)
+    op.create_index('ux_mv_user_signups_daily_day', 'mv_user_signups_daily', ['day'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS mv_user_signups_daily')
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS mv_catalog_growth_monthly')
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS mv_games_per_platform')
@@ -0,0 +1,32 @@
+"""game listing indexes
+
+Revision ID: a45061c11b2d
+Revises: becd63df4dfe
+Create Date: 2026-10-18 12:04:31.215907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a45061c11b2d'
+down_revision: Union[str, Sequence[str], None] = 'becd63df4dfe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_games_name_year_id', 'games', ['name', 'year', 'id'], unique=False)
+    op.create_index('ix_games_year_name_id', 'games', ['year', 'name', 'id'], unique=False)
+    op.create_index('ix_game_platform_platform_id_game_id', 'game_platform', ['platform_id', 'game_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_game_platform_platform_id_game_id', table_name='game_platform')
+    op.drop_index('ix_games_year_name_id', table_name='games')
+    op.drop_index('ix_games_name_year_id', table_name='games')
@@ -0,0 +1,28 @@
+"""games updated_at index
+
+Revision ID: b7a6bf3c6d3d
+Revises: 9c00f6661f6b
+Create Date: 2026-10-18 19:02:11.482137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a6bf3c6d3d'
+down_revision: Union[str, Sequence[str], None] = '9c00f6661f6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_games_updated_at', 'games', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_games_updated_at', table_name='games')
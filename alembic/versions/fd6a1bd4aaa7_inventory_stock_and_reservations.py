@@ -0,0 +1,59 @@
+"""inventory stock and reservations
+
+Revision ID: fd6a1bd4aaa7
+Revises: b7a6bf3c6d3d
+Create Date: 2026-10-18 21:14:37.205918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fd6a1bd4aaa7'
+down_revision: Union[str, Sequence[str], None] = 'b7a6bf3c6d3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stock_items',
+    sa.Column('game_id', sa.Integer(), nullable=False),
+    sa.Column('platform_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('reserved', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('quantity >= 0', name='ck_stock_items_quantity'),
+    sa.CheckConstraint('reserved >= 0 AND reserved <= quantity', name='ck_stock_items_reserved'),
+    sa.ForeignKeyConstraint(['game_id'], ['games.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['platform_id'], ['platforms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('game_id', 'platform_id')
+    )
+    op.create_table('stock_reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('game_id', sa.Integer(), nullable=False),
+    sa.Column('platform_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), server_default='active', nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('quantity > 0', name='ck_stock_reservations_quantity'),
+    sa.ForeignKeyConstraint(['game_id', 'platform_id'], ['stock_items.game_id', 'stock_items.platform_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stock_reservations_active_id', 'stock_reservations', ['id'], unique=False, postgresql_where=sa.text("status = 'active'"))
+    op.create_index('ix_stock_reservations_game_id_platform_id', 'stock_reservations', ['game_id', 'platform_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_reservations_game_id_platform_id', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_active_id', table_name='stock_reservations', postgresql_where=sa.text("status = 'active'"))
+    op.drop_table('stock_reservations')
+    op.drop_table('stock_items')
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table
+
+# Материализованные представления живут в отдельной MetaData: их создаёт миграция,
+# а autogenerate Alembic (Base.metadata) не должен принимать их за таблицы
+views_metadata = MetaData()
+
+games_per_platform_view = Table(
+    "mv_games_per_platform",
+    views_metadata,
+    Column("platform_id", Integer, primary_key=True),
+    Column("platform", String(100)),
+    Column("games", Integer),
+)
+
+catalog_growth_view = Table(
+    "mv_catalog_growth_monthly",
+    views_metadata,
+    Column("month", Date, primary_key=True),
+    Column("games", Integer),
+)
+
+user_signups_view = Table(
+    "mv_user_signups_daily",
+    views_metadata,
+    Column("day", Date, primary_key=True),
+    Column("users", Integer),
+)
+
+DASHBOARD_VIEWS = [games_per_platform_view, catalog_growth_view, user_signups_view]
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.analytics.repository import AnalyticsRepository
+from app.core.container import container
+from app.core.database import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_dashboard_views() -> None:
+    started = time.perf_counter()
+    async with unit_of_work() as session:
+        refreshed = await AnalyticsRepository.refresh_views(session)
+    if refreshed:
+        logger.info("Refreshed %s in %.1f ms", ", ".join(refreshed), (time.perf_counter() - started) * 1000)
+
+
+async def refresh_periodically(interval: int) -> None:
+    """Фоновая задача lifespan: представления обновляются по расписанию, а не на каждый запрос."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_dashboard_views()
+        except (SQLAlchemyError, OSError) as exc:
+            logger.warning("Analytics refresh failed: %s", exc)
+
+
+async def main() -> None:
+    # Для cron, если фоновое обновление в приложении выключено (ANALYTICS_REFRESH_INTERVAL=0)
+    await refresh_dashboard_views()
+    await container.aclose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
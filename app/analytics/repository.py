@@ -0,0 +1,55 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.models import (
+    DASHBOARD_VIEWS, catalog_growth_view, games_per_platform_view, user_signups_view
+)
+
+# Произвольная константа для pg_try_advisory_xact_lock: обновлением занимается один воркер
+REFRESH_LOCK_ID = 720_020
+
+
+class AnalyticsRepository:
+    """Чтение из материализованных представлений: размер ответа не зависит от размера таблиц."""
+
+    @staticmethod
+    async def games_per_platform(session: AsyncSession):
+        result = await session.execute(
+            select(games_per_platform_view.c.platform, games_per_platform_view.c.games)
+            .order_by(games_per_platform_view.c.games.desc(), games_per_platform_view.c.platform)
+        )
+        return result.all()
+
+    @staticmethod
+    async def catalog_growth(session: AsyncSession, since: date):
+        view = catalog_growth_view
+        # Нарастающий итог считается по всему представлению (сотни строк), а отдаются последние месяцы
+        growth = select(
+            view.c.month,
+            view.c.games,
+            func.sum(view.c.games).over(order_by=view.c.month).label("total"),
+        ).subquery()
+        result = await session.execute(select(growth).where(growth.c.month >= since).order_by(growth.c.month))
+        return result.all()
+
+    @staticmethod
+    async def user_signups(session: AsyncSession, since: date):
+        result = await session.execute(
+            select(user_signups_view.c.day, user_signups_view.c.users)
+            .where(user_signups_view.c.day >= since)
+            .order_by(user_signups_view.c.day)
+        )
+        return result.all()
+
+    @staticmethod
+    async def refresh_views(session: AsyncSession) -> List[str]:
+        """REFRESH ... CONCURRENTLY не блокирует чтение; пустой список — обновляет другой воркер."""
+        locked = await session.scalar(select(func.pg_try_advisory_xact_lock(REFRESH_LOCK_ID)))
+        if not locked:
+            return []
+        for view in DASHBOARD_VIEWS:
+            await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+        return [view.name for view in DASHBOARD_VIEWS]
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_read_session
+from app.core.page_cache import page_cache
+from app.dependencies.templates import templates
+from app.analytics.schemas import Dashboard
+from app.analytics.service import dashboard_service, MAX_DAYS, MAX_MONTHS
+
+router = APIRouter()
+
+
+@router.get("/analytics", response_class=HTMLResponse)
+async def analytics_page(request: Request):
+    if cached := await page_cache.lookup(request):
+        return cached
+    return await page_cache.store(request, await templates.TemplateResponse("analytics/dashboard.html", {"request": request}))
+
+
+@router.get("/analytics/dashboard", response_model=Dashboard)
+async def get_dashboard(
+        days: int = Query(90, ge=1, le=MAX_DAYS),
+        months: int = Query(24, ge=1, le=MAX_MONTHS),
+        session: AsyncSession = Depends(get_read_session),
+):
+    return await dashboard_service(session, days=days, months=months)
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import date
+from typing import List
+
+
+class PlatformGames(BaseModel):
+    platform: str
+    games: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MonthlyGames(BaseModel):
+    month: date
+    games: int
+    total: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DailySignups(BaseModel):
+    day: date
+    users: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Dashboard(BaseModel):
+    games_per_platform: List[PlatformGames]
+    catalog_growth: List[MonthlyGames]
+    user_signups: List[DailySignups]
@@ -0,0 +1,25 @@
+from datetime import date, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.repository import AnalyticsRepository
+from app.analytics.schemas import Dashboard, DailySignups, MonthlyGames, PlatformGames
+
+MAX_DAYS = 366
+MAX_MONTHS = 120
+
+
+async def dashboard_service(session: AsyncSession, days: int = 90, months: int = 24) -> Dashboard:
+    today = date.today()
+    year, month = divmod(today.year * 12 + today.month - 1 - (months - 1), 12)
+    first_month = date(year, month + 1, 1)
+
+    platforms = await AnalyticsRepository.games_per_platform(session)
+    growth = await AnalyticsRepository.catalog_growth(session, since=first_month)
+    signups = await AnalyticsRepository.user_signups(session, since=today - timedelta(days=days - 1))
+
+    return Dashboard(
+        games_per_platform=[PlatformGames.model_validate(row) for row in platforms],
+        catalog_growth=[MonthlyGames.model_validate(row) for row in growth],
+        user_signups=[DailySignups.model_validate(row) for row in signups],
+    )
@@ -2,15 +2,12 @@ from fastapi import APIRouter, Request, Depends, Form, status, HTTPException, Re
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
-from app.auth.security import (
-    create_access_token,
-    create_refresh_token,
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-    REFRESH_TOKEN_EXPIRE_DAYS
-)
+from app.auth.security import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
+from app.auth.sessions import session_store
 from app.auth.schemas import LoginForm
 from app.auth.service import auth_user_service
 from app.dependencies.templates import templates
+from app.core.page_cache import page_cache
 
 router = APIRouter()
 
@@ -19,7 +16,9 @@ router = APIRouter()
 async def login_page(request: Request,):
     if request.state.user:
         return RedirectResponse("/", status_code=status.HTTP_303_SEE_OTHER)
-    return templates.TemplateResponse("users/login.html", {"request": request})
+    if cached := await page_cache.lookup(request):
+        return cached
+    return await page_cache.store(request, await templates.TemplateResponse("users/login.html", {"request": request}))
 
 
 @router.post("/login")
@@ -33,8 +32,7 @@ async def login_post(
 
     try:
         await auth_user_service(session, login_form)
-        access_token = create_access_token({"sub": login_form.username})
-        refresh_token = create_refresh_token({"sub": login_form.username})
+        access_token, refresh_token = await session_store.issue(login_form.username)
 
         response = RedirectResponse(url=f"/", status_code=status.HTTP_303_SEE_OTHER)
         response.set_cookie(
@@ -55,7 +53,9 @@ async def login_post(
         )
         return response
     except HTTPException as exc:
-        return templates.TemplateResponse(
+        if exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+            raise
+        return await templates.TemplateResponse(
             "users/login.html",
             {
                 "request": request,
@@ -70,6 +70,7 @@ async def logout(
         request: Request,
         response: Response
 ):
+    await session_store.revoke((request.scope.get("auth") or {}).get("sid"))
     response = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
@@ -1,43 +1,111 @@
 from fastapi import HTTPException, Depends, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError, ExpiredSignatureError
-from passlib.context import CryptContext
+from jwt import InvalidTokenError, ExpiredSignatureError
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+import asyncio
+import hashlib
+import time
+import jwt
+from app.core.cache import TTLCache
+from app.core.container import container
 from app.core.database import get_session
 from app.users.repository import UserRepository
 from app.core.config import settings
-from typing import Optional
+from typing import Optional, Tuple
 
-SECRET_KEY = settings.SECRET_KEY
-REFRESH_SECRET_KEY = settings.REFRESH_SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+def _create_pwd_context():
+    from passlib.context import CryptContext
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+pwd_context = container.register("pwd_context", _create_pwd_context)
+
+# bcrypt блокирует поток ~200 мс, поэтому в async-коде считаем хэши в отдельном пуле
+_hash_executor = container.register(
+    "hash_executor",
+    lambda: ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"),
+    close=lambda executor: executor.shutdown(wait=False),
+)
+_hash_pending = 0
+
+# Подпись токена проверяется один раз; дальше payload берётся по хэшу токена до его exp
+_verified_tokens = container.register(
+    "verified_tokens", lambda: TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+)
+
+
+async def _run_in_hash_pool(func, *args):
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, попробуйте позже",
+            headers={"Retry-After": "1"}
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor.resolve(), func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Проверяет пароль в пуле; второй элемент — новый хэш, если сменился cost factor."""
+    return await _run_in_hash_pool(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_hash_pool(pwd_context.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": int(expire.timestamp())})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": int(expire.timestamp()), "iat": int(now.timestamp())})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     to_encode["token_type"] = "refresh"
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
     to_encode["exp"] = int(expire.timestamp())
-    return jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+    to_encode["iat"] = int(now.timestamp())
+    return jwt.encode(to_encode, settings.REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _decode_cached(token: str, secret: str, kind: str) -> dict:
+    key = (kind, hashlib.blake2b(token.encode(), digest_size=16).digest())
+    payload = _verified_tokens.get(key)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            return payload
+        _verified_tokens.delete(key)
+        raise ExpiredSignatureError("Signature has expired")
+
+    payload = jwt.decode(token, secret, algorithms=[ALGORITHM], options={"require": ["exp"]})
+    _verified_tokens.set(key, payload, ttl=min(settings.TOKEN_CACHE_TTL, payload["exp"] - time.time()))
+    return payload
+
+
+def decode_access_token(token: str) -> dict:
+    return _decode_cached(token, settings.SECRET_KEY, "access")
+
+
+def decode_refresh_token(token: str) -> dict:
+    payload = _decode_cached(token, settings.REFRESH_SECRET_KEY, "refresh")
+    if payload.get("token_type") != "refresh":
+        raise InvalidTokenError("Not a refresh token")
+    return payload
 
 
 async def get_current_user(
@@ -49,6 +117,14 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"}
     )
+
+    # AuthMiddleware уже проверил токены → берём принципала из scope
+    if "auth" in request.scope:
+        user = request.scope.get("user")
+        if not user:
+            raise credentials_exception
+        return user
+
     access_token = request.cookies.get("access_token")
     refresh_token = request.cookies.get("refresh_token")
 
@@ -56,44 +132,28 @@ async def get_current_user(
     if not access_token and not refresh_token:
         raise credentials_exception
 
-    # только Refresh → Вернём пользователя (middleware создаст новые куки)
-    if not access_token and refresh_token:
+    payload = None
+    if access_token:
         try:
-            payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-            if payload.get("token_type") != "refresh" or not payload.get("sub"):
-                raise credentials_exception
-            user = await UserRepository.get_user_by_username(session, payload["sub"])
-            if not user:
-                raise credentials_exception
-            return user
-        except JWTError:
+            payload = decode_access_token(access_token)
+        except ExpiredSignatureError:
+            # Access истек, проверим Refresh
+            pass
+        except InvalidTokenError:
             raise credentials_exception
 
-    # Access → проверим и вернём пользователя
-    try:
-        payload = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM])
-        if not payload.get("sub"):
-            raise credentials_exception
-        user = await UserRepository.get_user_by_username(session, payload["sub"])
-        if not user:
-            raise credentials_exception
-        return user
-    except ExpiredSignatureError:
-        # Access истек, проверим Refresh
-        if not refresh_token:
-            raise credentials_exception
+    if payload is None and refresh_token:
         try:
-            payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-            if payload.get("token_type") != "refresh" or not payload.get("sub"):
-                raise credentials_exception
-            user = await UserRepository.get_user_by_username(session, payload["sub"])
-            if not user:
-                raise credentials_exception
-            return user
-        except JWTError:
+            payload = decode_refresh_token(refresh_token)
+        except InvalidTokenError:
             raise credentials_exception
-    except JWTError:
+
+    if not payload or not payload.get("sub"):
+        raise credentials_exception
+    user = await UserRepository.get_user_by_username(session, payload["sub"])
+    if not user:
         raise credentials_exception
+    return user
 
 
 async def get_current_user_optional(
@@ -1,14 +1,21 @@
 from fastapi import HTTPException, status
 from app.users.repository import UserRepository
-from app.auth.security import verify_password
+from app.auth.security import verify_password_async
 from app.auth.schemas import LoginForm
 
 
 async def auth_user_service(session, login_form: LoginForm):
     user = await UserRepository.get_user_by_username(session, login_form.username)
-    if not user or not verify_password(login_form.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await verify_password_async(login_form.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный логин или пароль"
         )
+    # Хэш со старыми параметрами bcrypt → пересчитываем прозрачно при входе
+    if new_hash:
+        user.hashed_password = new_hash
+        await UserRepository.update_user(session, user)
     return user
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+import secrets
+from typing import Dict, NamedTuple, Optional, Protocol, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.container import container
+from app.auth.security import create_access_token, create_refresh_token, REFRESH_TOKEN_EXPIRE_DAYS
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TTL = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+
+class TokenPair(NamedTuple):
+    access: str
+    refresh: str
+
+
+class SessionStoreBackend(Protocol):
+    async def get(self, sid: str) -> Optional[dict]: ...
+
+    async def put(self, sid: str, record: dict, ttl: int) -> None: ...
+
+    async def delete(self, sid: str) -> None: ...
+
+    async def claim_rotation(self, sid: str, jti: str, pair: TokenPair, ttl: int) -> Optional[TokenPair]: ...
+
+    async def get_rotation(self, sid: str, jti: str) -> Optional[TokenPair]: ...
+
+
+class MemorySessionStoreBackend:
+    """Сессии в памяти процесса — только для одного воркера (dev, тесты).
+
+    Другие воркеры и этот же после перезапуска сессию не найдут и отклонят токены,
+    поэтому app.server не запускает несколько воркеров с этим бэкендом.
+    """
+
+    def __init__(self, maxsize: int, grace: int):
+        self.sessions = TTLCache(maxsize=maxsize, ttl=REFRESH_TTL)
+        self.rotations = TTLCache(maxsize=maxsize, ttl=grace)
+
+    async def get(self, sid: str) -> Optional[dict]:
+        return self.sessions.get(sid)
+
+    async def put(self, sid: str, record: dict, ttl: int) -> None:
+        self.sessions.set(sid, record, ttl=ttl)
+
+    async def delete(self, sid: str) -> None:
+        self.sessions.delete(sid)
+
+    async def claim_rotation(self, sid: str, jti: str, pair: TokenPair, ttl: int) -> Optional[TokenPair]:
+        # Между get и set нет await, поэтому в пределах event loop это атомарно
+        shared = self.rotations.get((sid, jti))
+        if shared is None:
+            self.rotations.set((sid, jti), pair, ttl=ttl)
+        return shared
+
+    async def get_rotation(self, sid: str, jti: str) -> Optional[TokenPair]:
+        return self.rotations.get((sid, jti))
+
+
+class RedisSessionStoreBackend:
+    """Общее хранилище сессий для всех воркеров; клиент с API redis.asyncio."""
+
+    def __init__(self, client, prefix: str = "session:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, sid: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + sid)
+        return json.loads(raw) if raw else None
+
+    async def put(self, sid: str, record: dict, ttl: int) -> None:
+        await self.client.set(self.prefix + sid, json.dumps(record), ex=ttl)
+
+    async def delete(self, sid: str) -> None:
+        await self.client.delete(self.prefix + sid)
+
+    async def claim_rotation(self, sid: str, jti: str, pair: TokenPair, ttl: int) -> Optional[TokenPair]:
+        key = f"{self.prefix}rotation:{sid}:{jti}"
+        if await self.client.set(key, json.dumps(pair), ex=ttl, nx=True):
+            return None
+        return await self.get_rotation(sid, jti)
+
+    async def get_rotation(self, sid: str, jti: str) -> Optional[TokenPair]:
+        raw = await self.client.get(f"{self.prefix}rotation:{sid}:{jti}")
+        return TokenPair(*json.loads(raw)) if raw else None
+
+
+class SessionStore:
+    """Серверные refresh-сессии: ротация с окном отсрочки, обнаружение повторов, отзыв по sid.
+
+    Запись сессии хранит текущий и предыдущий jti refresh-токена. Предъявлен текущий —
+    выпускаем новую пару; предыдущий в пределах grace — отдаём уже выпущенную пару
+    (параллельные запросы браузера); более старый — токен украден или переигран,
+    сессия отзывается целиком.
+    """
+
+    def __init__(self, backend: SessionStoreBackend, grace: int):
+        self.backend = backend
+        self.grace = grace
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    @staticmethod
+    def _mint(sid: str, username: str) -> Tuple[TokenPair, str]:
+        jti = secrets.token_urlsafe(16)
+        pair = TokenPair(
+            access=create_access_token({"sub": username, "sid": sid}),
+            refresh=create_refresh_token({"sub": username, "sid": sid, "jti": jti}),
+        )
+        return pair, jti
+
+    async def issue(self, username: str) -> TokenPair:
+        sid = secrets.token_urlsafe(16)
+        pair, jti = self._mint(sid, username)
+        await self.backend.put(sid, {"user": username, "jti": jti, "prev_jti": None}, REFRESH_TTL)
+        return pair
+
+    async def is_active(self, sid: Optional[str]) -> bool:
+        # Токены, выпущенные до появления sid, живут до своего exp
+        return sid is None or await self.backend.get(sid) is not None
+
+    async def revoke(self, sid: Optional[str]) -> None:
+        if sid:
+            await self.backend.delete(sid)
+
+    async def refresh(self, payload: dict) -> Optional[TokenPair]:
+        """Новая пара по проверенному refresh-payload; None — сессия отозвана или токен переигран."""
+        username, sid, jti = payload.get("sub"), payload.get("sid"), payload.get("jti")
+        if not sid or not jti:
+            # Refresh-токен старого формата: его нельзя ни повернуть, ни отозвать, ни распознать
+            # при повторе — не обмениваем на новую сессию, пользователь входит заново
+            return None
+
+        # Один выпуск на (сессия, токен): параллельные запросы ждут результата первого
+        key = (sid, jti)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            pair = await self._rotate(username, sid, jti)
+            future.set_result(pair)
+            return pair
+        except Exception as exc:
+            future.set_exception(exc)
+            # Исключение уже передано ожидающим; если их нет, не даём asyncio ругаться
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+
+    async def _rotate(self, username: str, sid: str, jti: str) -> Optional[TokenPair]:
+        record = await self.backend.get(sid)
+        if record is None or record["user"] != username:
+            return None
+
+        if jti == record["jti"]:
+            pair, new_jti = self._mint(sid, username)
+            shared = await self.backend.claim_rotation(sid, jti, pair, self.grace)
+            if shared is not None:
+                # Другой воркер уже повернул этот токен
+                return shared
+            record.update(jti=new_jti, prev_jti=jti)
+            await self.backend.put(sid, record, REFRESH_TTL)
+            return pair
+
+        if jti == record.get("prev_jti"):
+            shared = await self.backend.get_rotation(sid, jti)
+            if shared is not None:
+                return shared
+
+        logger.warning("Refresh token reuse detected for %s, revoking session %s", username, sid)
+        await self.backend.delete(sid)
+        return None
+
+
+def build_session_store_backend() -> SessionStoreBackend:
+    if settings.SESSION_STORE_BACKEND == "redis":
+        from redis import asyncio as redis
+
+        return RedisSessionStoreBackend(redis.from_url(settings.SESSION_STORE_REDIS_URL))
+    return MemorySessionStoreBackend(maxsize=settings.SESSION_STORE_SIZE, grace=settings.REFRESH_GRACE_SECONDS)
+
+
+async def close_session_store(store: SessionStore) -> None:
+    client = getattr(store.backend, "client", None)
+    if client is not None:
+        await client.aclose()
+
+
+session_store = container.register(
+    "session_store",
+    lambda: SessionStore(build_session_store_backend(), grace=settings.REFRESH_GRACE_SECONDS),
+    close=close_session_store,
+)
@@ -0,0 +1,142 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from typing import Dict, Iterable
+
+import anyio
+import brotli
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+STATIC_DIR = "app/static"
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+FINGERPRINT_DIRS = ("css", "js")
+COMPRESS_MIN_SIZE = 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Порядок важен: при поддержке обоих кодеков отдаём brotli
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # Несколько воркеров могут собирать ассеты одновременно — пишем через rename
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_assets(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    """Копирует css/js в dist/ с хэшем в имени, рядом кладёт .gz и .br; возвращает манифест."""
+    manifest: Dict[str, str] = {}
+    for folder in FINGERPRINT_DIRS:
+        source_dir = os.path.join(static_dir, folder)
+        if not os.path.isdir(source_dir):
+            continue
+        target_dir = os.path.join(static_dir, DIST_DIR, folder)
+        os.makedirs(target_dir, exist_ok=True)
+
+        for file_name in sorted(os.listdir(source_dir)):
+            source = os.path.join(source_dir, file_name)
+            if not os.path.isfile(source):
+                continue
+            with open(source, "rb") as file:
+                content = file.read()
+
+            digest = hashlib.blake2b(content, digest_size=6).hexdigest()
+            stem, ext = os.path.splitext(file_name)
+            hashed_name = f"{stem}.{digest}{ext}"
+            target = os.path.join(target_dir, hashed_name)
+            manifest[f"{folder}/{file_name}"] = f"{DIST_DIR}/{folder}/{hashed_name}"
+
+            if os.path.exists(target):
+                continue
+            _write_atomic(target, content)
+            if len(content) >= COMPRESS_MIN_SIZE:
+                _write_atomic(target + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+                _write_atomic(target + ".br", brotli.compress(content, quality=11))
+
+    _write_atomic(
+        os.path.join(static_dir, DIST_DIR, MANIFEST_NAME),
+        json.dumps(manifest, indent=2, sort_keys=True).encode()
+    )
+    return manifest
+
+
+def load_manifest(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    try:
+        with open(os.path.join(static_dir, DIST_DIR, MANIFEST_NAME), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles, который отдаёт готовые .br/.gz и ставит immutable для файлов из dist/."""
+
+    def __init__(self, *args, immutable_patterns: Iterable[re.Pattern] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_patterns = tuple(immutable_patterns)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not path.startswith(DIST_DIR + os.sep):
+            response = await super().get_response(path, scope)
+            if any(pattern.match(path.replace(os.sep, "/")) for pattern in self.immutable_patterns):
+                response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            return response
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        response = None
+        for coding, suffix in PRECOMPRESSED:
+            if not accepts_encoding(accept_encoding, coding):
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None:
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["content-encoding"] = coding
+            if response.status_code == 200:
+                media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["content-type"] = media_type
+            break
+
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["vary"] = "Accept-Encoding"
+        return response
+
+
+def install_asset_urls(templates, manifest: Dict[str, str]) -> None:
+    """Подменяет url_for('static', path=...) в шаблонах на хэшированные имена из манифеста."""
+    url_for = getattr(templates.env.globals["url_for"], "__wrapped__", templates.env.globals["url_for"])
+
+    @pass_context
+    def asset_url_for(context, name: str, /, **path_params):
+        if name == "static" and "path" in path_params:
+            path_params["path"] = manifest.get(path_params["path"], path_params["path"])
+        return url_for(context, name, **path_params)
+
+    asset_url_for.__wrapped__ = url_for
+    templates.env.globals["url_for"] = asset_url_for
+
+
+if __name__ == "__main__":
+    built = build_assets()
+    print(f"Built {len(built)} assets into {os.path.join(STATIC_DIR, DIST_DIR)}")
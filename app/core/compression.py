@@ -0,0 +1,152 @@
+import zlib
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.assets import accepts_encoding
+from app.core.config import settings
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class GzipStream:
+    def __init__(self, level: int):
+        # wbits=31 — формат gzip (заголовок и CRC), а не «голый» deflate
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        # Z_SYNC_FLUSH отдаёт всё сжатое сразу: клиент начинает разбирать страницу, не дожидаясь конца
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    # Brotli плотнее gzip на HTML при сравнимой цене, поэтому он первый
+    for coding in ("br", "gzip"):
+        if accepts_encoding(accept_encoding, coding):
+            return coding
+    return None
+
+
+def add_vary(headers: MutableHeaders, field: str) -> None:
+    # Кэш страниц сам перечисляет Accept-Encoding в Vary — не дублируем его
+    present = {value.strip().lower() for value in headers.get("vary", "").split(",")}
+    if field.lower() not in present:
+        headers.add_vary_header(field)
+
+
+def make_stream(coding: str):
+    if coding == "br":
+        return BrotliStream(settings.COMPRESSION_BROTLI_QUALITY)
+    return GzipStream(settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Потоковое сжатие динамических ответов (HTML, JSON) без буферизации всего тела.
+
+    Статика пропускается: в dist/ уже лежат .br/.gz, а изображения сжаты сами по себе.
+    """
+
+    SKIP_PREFIXES = ("/static/",)
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await CompressedResponder(self.app, coding, self.minimum_size)(scope, receive, send)
+
+
+class CompressedResponder:
+    def __init__(self, app: ASGIApp, coding: str, minimum_size: int):
+        self.app = app
+        self.coding = coding
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.start_message: Optional[Message] = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def should_compress(self, headers: Headers, status: int) -> bool:
+        if status < 200 or status in (204, 206, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        content_length = headers.get("content-length")
+        return content_length is None or int(content_length) >= self.minimum_size
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Заголовки придержим до первого куска тела: по нему видно, стоит ли сжимать
+            self.start_message = message
+            self.passthrough = not self.should_compress(Headers(raw=message["headers"]), message["status"])
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None:
+            if not more_body and len(body) < self.minimum_size:
+                # Короткий ответ целиком: сжатие не окупит заголовки и CPU
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.stream = make_stream(self.coding)
+            headers = MutableHeaders(scope=self.start_message)
+            headers["content-encoding"] = self.coding
+            add_vary(headers, "Accept-Encoding")
+            del headers["content-length"]
+            # Сжатое представление побайтно отличается от исходного — ETag становится слабым
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["etag"] = "W/" + etag
+            await self.send(self.start_message)
+
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,4 +1,9 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import TYPE_CHECKING, List, Optional
+from app.core.container import container
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
 
 
 class Settings(BaseSettings):
@@ -8,20 +13,137 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_NAME: str
 
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    # Сколько соединений воркер открывает при старте, до приёма трафика
+    DB_POOL_WARM: int = 5
+
+    # Реплика для чтения; если не задана, читаем с основного сервера
+    DB_REPLICA_HOST: Optional[str] = None
+    DB_REPLICA_PORT: Optional[int] = None
+
     SECRET_KEY: str
     REFRESH_SECRET_KEY: str
 
     SESSION_SECRET_KEY: str
 
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: int = 60
+
+    # Серверные refresh-сессии: memory | redis.
+    # memory — только для одного воркера: сессию видит лишь выдавший её процесс, и после
+    # перезапуска она пропадает — токены отклоняются, пользователя разлогинивает.
+    # При SERVER_WORKERS > 1 нужен redis, иначе app.server откажется запускаться
+    SESSION_STORE_BACKEND: str = "memory"
+    SESSION_STORE_REDIS_URL: Optional[str] = None
+    SESSION_STORE_SIZE: int = 100_000
+    REFRESH_GRACE_SECONDS: int = 30
+
+    # Кэш проверенных JWT; запись живёт не дольше exp токена
+    TOKEN_CACHE_SIZE: int = 4096
+    TOKEN_CACHE_TTL: int = 300
+
+    # Кэш пользователей (USER_CACHE_*) и страницы при PAGE_CACHE_BACKEND=memory живут в памяти
+    # каждого воркера. Инвалидация после изменения профиля рассылается остальным воркерам
+    # через этот Redis; без него при нескольких воркерах остальные отдают старый профиль
+    # и аватар до истечения TTL, поэтому для SERVER_WORKERS > 1 он обязателен
+    CACHE_INVALIDATION_REDIS_URL: Optional[str] = None
+
+    # Кэш отрендеренных страниц: memory | redis | none
+    PAGE_CACHE_BACKEND: str = "memory"
+    PAGE_CACHE_SIZE: int = 512
+    PAGE_CACHE_TTL: int = 300
+    PAGE_CACHE_REDIS_URL: Optional[str] = None
+
+    AVATAR_WORKERS: int = 2
+
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+
+    # Продакшен-запуск: python -m app.server. Без SERVER_WORKERS воркеров по числу ядер,
+    # если сессии и инвалидация кэшей идут через Redis (см. multi_worker_problems), иначе один;
+    # SERVER_WORKERS > 1 при состоянии в памяти процесса — ошибка запуска
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: Optional[int] = None
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    # Сколько ждать готовности нового воркера при SIGHUP, прежде чем всё равно погасить старый
+    SERVER_READY_TIMEOUT: int = 60
+
+    # Продакшен-режим шаблонов: bytecode cache, без auto_reload, асинхронный рендеринг
+    TEMPLATES_PRODUCTION: bool = False
+    TEMPLATES_CACHE_DIR: Optional[str] = None
+
+    # Сжатие динамических ответов; уровни подобраны по benchmarks/compression.py
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Период обновления материализованных представлений дашборда, сек; 0 — только по cron
+    ANALYTICS_REFRESH_INTERVAL: int = 300
+
+    # Снимок каталога игр в памяти воркера: листинг и поиск по id без запросов к БД.
+    # Изменения подтягиваются по updated_at раз в REFRESH_INTERVAL сек с перекрытием OVERLAP
+    # (транзакция, начатая раньше, может закоммититься позже); полная пересборка — раз в RESYNC_INTERVAL
+    CATALOG_ENABLED: bool = False
+    CATALOG_REFRESH_INTERVAL: int = 5
+    CATALOG_REFRESH_OVERLAP: int = 30
+    CATALOG_RESYNC_INTERVAL: int = 600
+
+    # Профилирование запросов: Server-Timing, /metrics, детектор N+1
+    PROFILING_ENABLED: bool = False
+    PROFILING_N_PLUS_ONE_THRESHOLD: int = 5
+    PROFILING_SLOW_REQUEST_MS: int = 500
+    PROFILING_SLOW_STATEMENTS: int = 3
+
     model_config = SettingsConfigDict(
         env_file='.env',
         env_file_encoding='utf-8',
         extra='ignore'
     )
 
-    def db_url(self, async_fallback: bool = False) -> str:
+    def db_url(self, async_fallback: bool = False, replica: bool = False) -> str:
         driver = "postgresql+asyncpg" if async_fallback else "postgresql+psycopg2"
-        return f"{driver}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        host = self.DB_REPLICA_HOST if replica and self.DB_REPLICA_HOST else self.DB_HOST
+        port = (self.DB_REPLICA_PORT or self.DB_PORT) if replica else self.DB_PORT
+        return f"{driver}://{self.DB_USER}:{self.DB_PASSWORD}@{host}:{port}/{self.DB_NAME}"
+
+    def multi_worker_problems(self) -> List[str]:
+        """Настройки, при которых состояние живёт в памяти процесса и несколько воркеров разойдутся."""
+        problems = []
+        if self.SESSION_STORE_BACKEND != "redis":
+            problems.append("SESSION_STORE_BACKEND=memory: sessions are only valid on the worker that issued them")
+        if not self.CACHE_INVALIDATION_REDIS_URL:
+            problems.append("CACHE_INVALIDATION_REDIS_URL is not set: user and page cache invalidations stay on one worker")
+        return problems
+
+    @property
+    def has_read_replica(self) -> bool:
+        return bool(self.DB_REPLICA_HOST)
+
+    def create_engine(self, replica: bool = False) -> "AsyncEngine":
+        # Импорт SQLAlchemy и драйвера — только когда движок действительно нужен
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = self.db_url(async_fallback=True, replica=replica)
+        return create_async_engine(
+            f"{url}?prepared_statement_cache_size={self.DB_STATEMENT_CACHE_SIZE}",
+            echo=self.DB_ECHO,
+            pool_size=self.DB_POOL_SIZE,
+            max_overflow=self.DB_MAX_OVERFLOW,
+            pool_timeout=self.DB_POOL_TIMEOUT,
+            pool_recycle=self.DB_POOL_RECYCLE,
+            pool_pre_ping=self.DB_POOL_PRE_PING,
+            connect_args={"statement_cache_size": self.DB_STATEMENT_CACHE_SIZE},
+        )
 
 
-settings = Settings()
+# .env читается при первом обращении к настройкам, а не при импорте
+settings: Settings = container.register("settings", Settings)
@@ -0,0 +1,79 @@
+"""Ресурсы процесса — настройки, движки БД, шаблоны, кэши, пулы потоков.
+
+Импорт модулей приложения ничего не читает и не открывает: ресурс создаётся при
+первом обращении к нему, а lifespan приложения закрывает созданные через
+container.aclose(). Поэтому alembic, CLI-скрипты и тесты платят только за то,
+чем пользуются.
+"""
+import inspect
+import threading
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Resource(Generic[T]):
+    """Ленивая ссылка на ресурс: атрибуты и вызов проксируются в объект из фабрики.
+
+    Сам объект — resolve(); имена методов прокси не должны совпадать с методами ресурса
+    (у кэшей есть get, поэтому здесь его нет).
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T], close: Optional[Callable[[T], Any]] = None):
+        self._name = name
+        self._factory = factory
+        self._close = close
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> T:
+        instance = self._instance
+        if instance is None:
+            # Фабрику могут дёрнуть из пула потоков; второй движок с пулом соединений нам не нужен
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    @property
+    def created(self) -> bool:
+        return self._instance is not None
+
+    async def aclose(self) -> None:
+        instance, self._instance = self._instance, None
+        if instance is not None and self._close is not None:
+            result = self._close(instance)
+            if inspect.isawaitable(result):
+                await result
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "created" if self.created else "lazy"
+        return f"<Resource {self._name} ({state})>"
+
+
+class Container:
+    def __init__(self):
+        self._resources: Dict[str, Resource] = {}
+
+    def register(self, name: str, factory: Callable[[], T], close: Optional[Callable[[T], Any]] = None) -> Resource[T]:
+        resource = Resource(name, factory, close)
+        self._resources[name] = resource
+        return resource
+
+    def created(self) -> list:
+        return [name for name, resource in self._resources.items() if resource.created]
+
+    async def aclose(self) -> None:
+        """Закрывает созданные ресурсы в обратном порядке; следующее обращение создаст их заново."""
+        for resource in reversed(list(self._resources.values())):
+            await resource.aclose()
+
+
+container = Container()
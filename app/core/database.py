@@ -1,17 +1,86 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
+from app.core.container import Resource, container
 
 
-DATABASE_URL = settings.db_url(async_fallback=True)
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+def _create_read_engine() -> AsyncEngine:
+    return settings.create_engine(replica=True) if settings.has_read_replica else engine.resolve()
+
+
+async def _dispose_read_engine(read: AsyncEngine) -> None:
+    # Без реплики это тот же движок, что и основной, — его закроет свой ресурс
+    if settings.has_read_replica:
+        await read.dispose()
+
+
+# Движки и фабрики сессий создаются при первом запросе к базе и закрываются в lifespan
+engine: Resource[AsyncEngine] = container.register("engine", lambda: settings.create_engine(), close=AsyncEngine.dispose)
+read_engine: Resource[AsyncEngine] = container.register("read_engine", _create_read_engine, close=_dispose_read_engine)
+async_session: Resource[async_sessionmaker] = container.register(
+    "async_session", lambda: async_sessionmaker(engine.resolve(), expire_on_commit=False)
+)
+async_read_session: Resource[async_sessionmaker] = container.register(
+    "async_read_session", lambda: async_sessionmaker(read_engine.resolve(), expire_on_commit=False)
+)
 
 
 class Base(DeclarativeBase):
-    pass
+    # server_default/onupdate-колонки (created_at, updated_at) приходят через RETURNING
+    # при flush, поэтому после записи не нужен отдельный refresh()
+    __mapper_args__ = {"eager_defaults": True}
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Откладывает побочный эффект (инвалидация кэша, удаление файла) до успешного коммита."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+def after_rollback(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Убирает следы работы, отменённой откатом (например, подготовленные файлы)."""
+    session.info.setdefault("after_rollback", []).append(callback)
+
+
+@asynccontextmanager
+async def unit_of_work(session_factory: async_sessionmaker = async_session) -> AsyncIterator[AsyncSession]:
+    """Одна транзакция на единицу работы: репозитории только делают flush, коммит — здесь.
+
+    Для частичного отката внутри используйте savepoint: ``async with session.begin_nested()``.
+    """
+    async with session_factory() as session:
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            for callback in session.info.pop("after_rollback", []):
+                await callback()
+            raise
+        session.info.pop("after_rollback", None)
+        for callback in session.info.pop("after_commit", []):
+            await callback()
+
+
+async def warm_pool(pool_engine: AsyncEngine, connections: int) -> None:
+    """Открывает соединения заранее, чтобы первые запросы воркера не ждали connect/TLS."""
+    async def ping():
+        async with pool_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    # Параллельно, иначе пул раз за разом отдаёт одно и то же соединение
+    await asyncio.gather(*(ping() for _ in range(connections)))
 
 
 async def get_session():
-    async with async_session() as session:
+    async with unit_of_work() as session:
+        yield session
+
+
+async def get_read_session():
+    """Сессия для read-only репозиториев: реплика, если она настроена."""
+    async with async_read_session() as session:
         yield session
@@ -0,0 +1,96 @@
+"""Инвалидация кэшей, которые живут в памяти каждого воркера.
+
+publish() сразу применяет инвалидацию в своём процессе и, если задан
+CACHE_INVALIDATION_REDIS_URL, рассылает её остальным воркерам через Redis pub/sub;
+listen() в lifespan применяет чужие сообщения. Pub/sub доставляет не больше одного
+раза: сообщение, пришедшее во время переподключения, теряется, и запись доживает
+до своего TTL — это верхняя граница устаревания.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Sequence, Union
+
+from app.core.config import settings
+from app.core.container import container
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache:invalidate"
+RECONNECT_DELAY = 1.0
+
+Handler = Callable[[Sequence[str]], Union[None, Awaitable[None]]]
+# Обработчики регистрируются при импорте модулей кэшей, сама шина — лениво
+_handlers: Dict[str, Handler] = {}
+
+
+def on_invalidate(kind: str) -> Callable[[Handler], Handler]:
+    def register(handler: Handler) -> Handler:
+        _handlers[kind] = handler
+        return handler
+    return register
+
+
+class InvalidationBus:
+    def __init__(self, client=None, channel: str = CHANNEL):
+        self.client = client
+        self.channel = channel
+        # Свои сообщения уже применены в publish — по origin их пропускаем
+        self.origin = uuid.uuid4().hex
+
+    @property
+    def shared(self) -> bool:
+        return self.client is not None
+
+    @staticmethod
+    async def _apply(kind: str, keys: Sequence[str]) -> None:
+        handler = _handlers.get(kind)
+        if handler is None:
+            return
+        result = handler(keys)
+        if inspect.isawaitable(result):
+            await result
+
+    async def publish(self, kind: str, *keys: str) -> None:
+        await self._apply(kind, keys)
+        if self.client is not None:
+            message = {"origin": self.origin, "kind": kind, "keys": keys}
+            await self.client.publish(self.channel, json.dumps(message))
+
+    async def _receive(self, raw: Any) -> None:
+        message = json.loads(raw)
+        if message["origin"] != self.origin:
+            await self._apply(message["kind"], message["keys"])
+
+    async def listen(self) -> None:
+        """Фоновая задача lifespan: слушает канал и переподключается после сбоев Redis."""
+        from redis.exceptions import RedisError
+
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            await self._receive(message["data"])
+            except (RedisError, OSError) as exc:
+                logger.warning("Cache invalidation channel lost: %s", exc)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+def build_invalidation_bus() -> InvalidationBus:
+    if settings.CACHE_INVALIDATION_REDIS_URL:
+        from redis import asyncio as redis
+
+        return InvalidationBus(redis.from_url(settings.CACHE_INVALIDATION_REDIS_URL))
+    return InvalidationBus()
+
+
+async def close_invalidation_bus(bus: InvalidationBus) -> None:
+    if bus.client is not None:
+        await bus.client.aclose()
+
+
+invalidation_bus = container.register("invalidation_bus", build_invalidation_bus, close=close_invalidation_bus)
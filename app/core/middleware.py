@@ -1,74 +1,118 @@
 from fastapi.responses import RedirectResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.database import async_session
 from app.users.repository import UserRepository
-from jose import jwt, JWTError
+from app.users.cache import get_cached_user, cache_user
+from jwt import InvalidTokenError
 from app.auth.security import (
-    REFRESH_SECRET_KEY, ALGORITHM,
-    create_access_token, create_refresh_token,
-    ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, SECRET_KEY
+    decode_access_token, decode_refresh_token,
+    ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 )
+from app.auth.sessions import session_store
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class AuthMiddleware:
     ALLOWED_PATHS = ["/login", "/register", "/favicon.ico"]
+    SKIP_PREFIXES = ("/static/",)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
     @staticmethod
     def is_allowed_path(path: str) -> bool:
-        if path.startswith("/static/css/") or path.startswith("/static/js/"):
-            return True
         return path in AuthMiddleware.ALLOWED_PATHS
 
     @staticmethod
-    async def fetch_user_by_username(username):
+    async def fetch_user_by_username(username, token_version=None):
+        user = get_cached_user(username, token_version)
+        if user:
+            return user
         async with async_session() as session:
-            return await UserRepository.get_user_by_username(session, username)
+            user = await UserRepository.get_user_by_username(session, username)
+        if user:
+            cache_user(username, token_version, user)
+        return user
 
-    async def dispatch(self, request, call_next):
-        access_token = request.cookies.get("access_token")
-        refresh_token = request.cookies.get("refresh_token")
-        user = None
+    async def authenticate(self, cookies: dict):
+        access_token = cookies.get("access_token")
+        refresh_token = cookies.get("refresh_token")
+        user, payload = None, None
         new_access, new_refresh = None, None
-        username = None
 
         if access_token:
             try:
-                payload = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM])
+                payload = decode_access_token(access_token)
                 username = payload.get("sub")
-                if username:
-                    user = await self.fetch_user_by_username(username)
-            except JWTError:
+                # Отзыв сессии — поиск по sid в хранилище, без запроса пользователя
+                if username and await session_store.is_active(payload.get("sid")):
+                    user = await self.fetch_user_by_username(username, payload.get("iat"))
+            except InvalidTokenError:
                 pass
 
         if not user and refresh_token:
             try:
-                payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-                if payload.get("token_type") == "refresh":
-                    username = payload.get("sub")
-                    if username:
-                        user = await self.fetch_user_by_username(username)
-                        if user:
-                            new_access = create_access_token({"sub": username})
-                            new_refresh = create_refresh_token({"sub": username})
-            except JWTError:
+                payload = decode_refresh_token(refresh_token)
+                username = payload.get("sub")
+                if username:
+                    user = await self.fetch_user_by_username(username, payload.get("iat"))
+                    # Параллельные запросы с тем же refresh-токеном получают одну новую пару
+                    pair = await session_store.refresh(payload) if user else None
+                    if pair:
+                        new_access, new_refresh = pair
+                    else:
+                        user = None
+            except InvalidTokenError:
                 pass
 
-        if not user and not self.is_allowed_path(request.url.path):
-            return RedirectResponse("/login", status_code=303)
-
-        request.state.user = user
-        response = await call_next(request)
-
-        if new_access and new_refresh:
-            response.set_cookie(
-                "access_token", new_access,
-                max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-                httponly=True, samesite="lax", secure=False
-            )
-            response.set_cookie(
-                "refresh_token", new_refresh,
-                max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
-                httponly=True, samesite="lax", secure=False
-            )
-
-        return response
+        return user, (payload if user else None), new_access, new_refresh
+
+    @staticmethod
+    def token_cookies(new_access: str, new_refresh: str) -> list[bytes]:
+        response = Response()
+        response.set_cookie(
+            "access_token", new_access,
+            max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            httponly=True, samesite="lax", secure=False
+        )
+        response.set_cookie(
+            "refresh_token", new_refresh,
+            max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+            httponly=True, samesite="lax", secure=False
+        )
+        return [value for key, value in response.raw_headers if key == b"set-cookie"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Статика и не-HTTP запросы проходят без проверки токенов
+        if scope["type"] != "http" or scope["path"].startswith(self.SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        user, payload, new_access, new_refresh = await self.authenticate(connection.cookies)
+
+        if not user and not self.is_allowed_path(scope["path"]):
+            response = RedirectResponse("/login", status_code=303)
+            await response(scope, receive, send)
+            return
+
+        scope["user"] = user
+        scope["auth"] = payload
+        scope.setdefault("state", {})["user"] = user
+
+        if not (new_access and new_refresh):
+            await self.app(scope, receive, send)
+            return
+
+        cookies = self.token_cookies(new_access, new_refresh)
+
+        async def send_with_cookies(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for cookie in cookies:
+                    headers.append("set-cookie", cookie.decode("latin-1"))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookies)
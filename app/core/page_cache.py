@@ -0,0 +1,174 @@
+import hashlib
+from typing import Iterable, Optional, Protocol, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.container import container
+from app.core.invalidation import invalidation_bus, on_invalidate
+from app.core.templating import AsyncTemplateResponse
+
+CacheEntry = Tuple[str, bytes]
+
+
+class PageCacheBackend(Protocol):
+    async def get(self, key: str) -> Optional[CacheEntry]: ...
+
+    async def set(self, key: str, entry: CacheEntry, tags: Iterable[str], ttl: int) -> None: ...
+
+    async def invalidate(self, tags: Iterable[str]) -> None: ...
+
+
+class MemoryPageCacheBackend:
+    def __init__(self, maxsize: int, ttl: int):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        item = self.cache.get(key)
+        return item[1] if item else None
+
+    async def set(self, key: str, entry: CacheEntry, tags: Iterable[str], ttl: int) -> None:
+        self.cache.set(key, (frozenset(tags), entry), ttl=ttl)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        self.cache.delete_where(lambda _, value: not tags.isdisjoint(value[0]))
+
+
+class RedisPageCacheBackend:
+    """Хранит страницы в Redis; подойдёт любой клиент с API redis.asyncio (например, fakeredis)."""
+
+    def __init__(self, client, prefix: str = "page:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self.client.get(self.prefix + key)
+        if not raw:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return etag.decode(), body
+
+    async def set(self, key: str, entry: CacheEntry, tags: Iterable[str], ttl: int) -> None:
+        etag, body = entry
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self.prefix + key, etag.encode() + b"\n" + body, ex=ttl)
+            for tag in tags:
+                pipe.sadd(f"{self.prefix}tag:{tag}", self.prefix + key)
+                pipe.expire(f"{self.prefix}tag:{tag}", ttl)
+            await pipe.execute()
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = await self.client.smembers(tag_key)
+            await self.client.delete(tag_key, *keys)
+
+
+class NullPageCacheBackend:
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return None
+
+    async def set(self, key: str, entry: CacheEntry, tags: Iterable[str], ttl: int) -> None:
+        pass
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        pass
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def user_viewer_tag(user_id: int) -> str:
+    return f"viewer:user:{user_id}"
+
+
+def viewer_tag(request: Request) -> str:
+    # В base.html шапка рисует аватар зрителя, поэтому залогиненные пользователи
+    # кэшируются каждый отдельно, а все анонимы делят одну запись
+    user = getattr(request.state, "user", None)
+    return user_viewer_tag(user.id) if user else "viewer:anon"
+
+
+def profile_tag(username: str) -> str:
+    return f"profile:{username}"
+
+
+class PageCache:
+    def __init__(self, backend: PageCacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+        return f"{viewer_tag(request)}:{request.url.path}?{query}"
+
+    @staticmethod
+    def _response(request: Request, etag: str, body: Optional[bytes]) -> Response:
+        # 304 проходит мимо CompressionMiddleware, поэтому Vary у обоих ответов задаём сами — целиком
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Cookie, Accept-Encoding"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="text/html", headers=headers)
+
+    async def lookup(self, request: Request) -> Optional[Response]:
+        entry = await self.backend.get(self.key_for(request))
+        if entry is None:
+            return None
+        etag, body = entry
+        return self._response(request, etag, body)
+
+    async def store(self, request: Request, response: Response, tags: Iterable[str] = ()) -> Response:
+        if response.status_code != 200:
+            return response
+        if isinstance(response, AsyncTemplateResponse):
+            await response.render_body()
+        etag = make_etag(response.body)
+        await self.backend.set(self.key_for(request), (etag, response.body), [viewer_tag(request), *tags], self.ttl)
+        return self._response(request, etag, response.body)
+
+    async def invalidate(self, *tags: str) -> None:
+        if isinstance(self.backend, MemoryPageCacheBackend):
+            # Страницы в памяти есть у каждого воркера — рассылаем инвалидацию всем
+            await invalidation_bus.publish("page", *tags)
+        else:
+            await self.backend.invalidate(tags)
+
+
+def build_page_cache_backend() -> PageCacheBackend:
+    if settings.PAGE_CACHE_BACKEND == "redis":
+        from redis import asyncio as redis
+
+        return RedisPageCacheBackend(redis.from_url(settings.PAGE_CACHE_REDIS_URL))
+    if settings.PAGE_CACHE_BACKEND == "none":
+        return NullPageCacheBackend()
+    return MemoryPageCacheBackend(maxsize=settings.PAGE_CACHE_SIZE, ttl=settings.PAGE_CACHE_TTL)
+
+
+@on_invalidate("page")
+async def drop_pages(tags: Sequence[str]) -> None:
+    await page_cache.backend.invalidate(tags)
+
+
+async def close_page_cache(cache: PageCache) -> None:
+    # Соединения с Redis закрываем сами, иначе они живут до сборки мусора
+    client = getattr(cache.backend, "client", None)
+    if client is not None:
+        await client.aclose()
+
+
+page_cache = container.register(
+    "page_cache", lambda: PageCache(build_page_cache_backend(), ttl=settings.PAGE_CACHE_TTL), close=close_page_cache
+)
@@ -0,0 +1,222 @@
+import heapq
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Статистика одного запроса: время, время в БД, число и самые медленные запросы."""
+
+    __slots__ = ("started", "db_time", "query_count", "statements", "slowest")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.query_count = 0
+        self.statements: Counter = Counter()
+        self.slowest: List[Tuple[float, str]] = []
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record_query(self, statement: str, duration: float) -> None:
+        self.db_time += duration
+        self.query_count += 1
+        # Параметры передаются отдельно, поэтому N+1 — это один и тот же текст запроса
+        self.statements[statement] += 1
+        item = (duration, statement)
+        if len(self.slowest) < settings.PROFILING_SLOW_STATEMENTS:
+            heapq.heappush(self.slowest, item)
+        elif item > self.slowest[0]:
+            heapq.heapreplace(self.slowest, item)
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'app;dur={self.elapsed * 1000:.1f}, '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries"'
+        )
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Метрики процесса в формате Prometheus; у каждого воркера uvicorn — свои."""
+
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.db_latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.requests: Counter = Counter()
+        self.queries: Counter = Counter()
+        self.n_plus_one: Counter = Counter()
+
+    def observe(self, method: str, route: str, status: int, profile: RequestProfile, n_plus_one: bool) -> None:
+        key = (method, route)
+        self.latency[key].observe(profile.elapsed)
+        self.db_latency[key].observe(profile.db_time)
+        self.requests[(method, route, status)] += 1
+        self.queries[key] += profile.query_count
+        if n_plus_one:
+            self.n_plus_one[key] += 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Request wall time by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines += histogram.render("http_request_duration_seconds", f'method="{method}",route="{route}"')
+
+        lines += [
+            "# HELP http_request_db_duration_seconds Time spent in SQL per request by route.",
+            "# TYPE http_request_db_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.db_latency.items()):
+            lines += histogram.render("http_request_db_duration_seconds", f'method="{method}",route="{route}"')
+
+        lines += ["# HELP http_requests_total Requests by route and status.", "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        lines += ["# HELP db_queries_total SQL statements by route.", "# TYPE db_queries_total counter"]
+        for (method, route), count in sorted(self.queries.items()):
+            lines.append(f'db_queries_total{{method="{method}",route="{route}"}} {count}')
+
+        lines += [
+            "# HELP db_n_plus_one_requests_total Requests with repeated identical statements.",
+            "# TYPE db_n_plus_one_requests_total counter",
+        ]
+        for (method, route), count in sorted(self.n_plus_one.items()):
+            lines.append(f'db_n_plus_one_requests_total{{method="{method}",route="{route}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        context._profiling_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = getattr(context, "_profiling_started", None)
+    if profile is not None and started is not None:
+        profile.record_query(statement, time.perf_counter() - started)
+
+
+def install_sql_instrumentation(*engines: AsyncEngine) -> None:
+    for engine in dict.fromkeys(engines):
+        if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(scope: Scope) -> str:
+    # Шаблон пути, а не сам путь: /users/{user_id}, иначе метрики разрастаются по id
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class ProfilingMiddleware:
+    """Server-Timing, метрики по маршрутам и детектор N+1 для каждого HTTP-запроса."""
+
+    SKIP_PREFIXES = ("/static/",)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("server-timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            self.report(scope, status, profile)
+
+    @staticmethod
+    def report(scope: Scope, status: int, profile: RequestProfile) -> None:
+        route = route_label(scope)
+        repeated = profile.repeated_statements(settings.PROFILING_N_PLUS_ONE_THRESHOLD)
+        metrics.observe(scope["method"], route, status, profile, bool(repeated))
+
+        for statement, count in repeated:
+            logger.warning("Possible N+1 on %s %s: %d x %s", scope["method"], route, count, statement)
+
+        elapsed_ms = profile.elapsed * 1000
+        if elapsed_ms >= settings.PROFILING_SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s: %.1f ms, db %.1f ms in %d queries; slowest:\n%s",
+                scope["method"], scope["path"], elapsed_ms, profile.db_time * 1000, profile.query_count,
+                "\n".join(f"  {duration * 1000:.1f} ms  {statement}"
+                          for duration, statement in sorted(profile.slowest, reverse=True))
+            )
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    # Метрики раскрывают маршруты и SQL-нагрузку — только для суперпользователей
+    if not request.state.user.is_superuser:
+        raise HTTPException(403, "Доступ запрещен!")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
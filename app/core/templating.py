@@ -0,0 +1,136 @@
+import logging
+import time
+from typing import Any, Optional, Tuple
+
+import anyio
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from starlette.background import BackgroundTask
+from starlette.responses import HTMLResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = "app/templates"
+STREAM_CHUNK_SIZE = 16 * 1024
+TEMPLATE_RESPONSE_ARGS = ("request", "name", "context", "status_code", "headers", "media_type", "background")
+
+
+class AsyncTemplateResponse(HTMLResponse):
+    """Ответ-шаблон, тело которого собирается асинхронно.
+
+    Templates.TemplateResponse рендерит его сразу, внутри обработчика, пока сессия
+    get_session ещё открыта. Исключение — stream=True: такой шаблон рендерится при
+    отправке, уже после commit и закрытия сессии, поэтому в контекст потоковой
+    страницы передают только загруженные данные — ленивые и lazy="raise" связи
+    там упадут.
+    """
+
+    def __init__(
+            self,
+            template: Template,
+            context: dict,
+            status_code: int = 200,
+            headers: Optional[dict] = None,
+            media_type: Optional[str] = None,
+            background: Optional[BackgroundTask] = None,
+            stream: bool = False,
+    ):
+        self.template = template
+        self.context = context
+        self.stream = stream
+        self.rendered = False
+        super().__init__(None, status_code, headers, media_type, background)
+
+    async def render_body(self) -> bytes:
+        if not self.rendered:
+            if self.template.environment.is_async:
+                content = await self.template.render_async(self.context)
+            else:
+                # Синхронное окружение (TEMPLATES_PRODUCTION=False) рендерит в потоке, не в event loop
+                content = await anyio.to_thread.run_sync(self.template.render, self.context)
+            self.body = content.encode(self.charset)
+            self.headers["content-length"] = str(len(self.body))
+            self.rendered = True
+        return self.body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Потоковая отдача есть только у async-окружения; синхронное рендерим целиком
+        if not self.stream or self.rendered or not self.template.environment.is_async:
+            await self.render_body()
+            await super().__call__(scope, receive, send)
+            return
+
+        del self.headers["content-length"]
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        # Jinja отдаёт текст мелкими кусками — склеиваем их, чтобы не слать сотни сообщений
+        buffer, size = [], 0
+        async for chunk in self.template.generate_async(self.context):
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_CHUNK_SIZE:
+                await send({"type": "http.response.body", "body": "".join(buffer).encode(self.charset), "more_body": True})
+                buffer, size = [], 0
+        await send({"type": "http.response.body", "body": "".join(buffer).encode(self.charset), "more_body": False})
+
+        if self.background is not None:
+            await self.background()
+
+
+class Templates(Jinja2Templates):
+    """Jinja2Templates, у которого await TemplateResponse(...) возвращает уже отрендеренный ответ.
+
+    stream=True — для больших страниц: они рендерятся при отправке, потоком.
+    """
+
+    async def TemplateResponse(self, *args: Any, stream: bool = False, **kwargs: Any) -> AsyncTemplateResponse:
+        if args and isinstance(args[0], str):
+            # Старый стиль вызова: TemplateResponse(name, {"request": request, ...})
+            context = args[1] if len(args) > 1 else kwargs["context"]
+            args = (context["request"], *args)
+        params = {**dict(zip(TEMPLATE_RESPONSE_ARGS, args)), **kwargs}
+
+        context = params.get("context") or {}
+        request = params.get("request") or context["request"]
+        context.setdefault("request", request)
+        for context_processor in self.context_processors:
+            context.update(context_processor(request))
+
+        response = AsyncTemplateResponse(
+            self.get_template(params["name"]),
+            context,
+            status_code=params.get("status_code", 200),
+            headers=params.get("headers"),
+            media_type=params.get("media_type"),
+            background=params.get("background"),
+            stream=stream,
+        )
+        if not stream:
+            await response.render_body()
+        return response
+
+
+def build_environment(production: bool, cache_dir: Optional[str] = None) -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        # В продакшене шаблоны не меняются: без проверки mtime на каждый get_template
+        auto_reload=not production,
+        enable_async=production,
+        bytecode_cache=FileSystemBytecodeCache(cache_dir) if production else None,
+    )
+
+
+def build_templates() -> Templates:
+    return Templates(env=build_environment(settings.TEMPLATES_PRODUCTION, settings.TEMPLATES_CACHE_DIR))
+
+
+def precompile_templates(templates: Jinja2Templates) -> Tuple[int, float]:
+    """Загружает все шаблоны в кэш окружения; с bytecode cache — без повторного парсинга."""
+    started = time.perf_counter()
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names), time.perf_counter() - started
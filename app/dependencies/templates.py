@@ -1,3 +1,4 @@
-from fastapi.templating import Jinja2Templates
+from app.core.container import container
+from app.core.templating import build_templates
 
-templates = Jinja2Templates(directory="app/templates")
+templates = container.register("templates", build_templates)
@@ -0,0 +1,300 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.container import container
+from app.core.database import after_commit, async_session
+from app.games.repository import GameRepository, PlatformRepository
+
+logger = logging.getLogger(__name__)
+
+# Порядок листинга — тот же, что у keyset-пагинации GameRepository.list_games: name там
+# сравнивается в collation "C", то есть по кодовым точкам, как str в Python
+sort_key = attrgetter("name", "year", "id")
+# Больше строк за раз дешевле пересортировать целиком, чем вставлять по одной
+RESORT_THRESHOLD = 256
+
+
+class CatalogGame:
+    """Запись снимка: только поля листинга; platforms — общий для одинаковых наборов кортеж id."""
+
+    __slots__ = ("id", "name", "year", "platforms")
+
+    def __init__(self, id: int, name: str, year: int, platforms: Tuple[int, ...]):
+        self.id = id
+        self.name = name
+        self.year = year
+        self.platforms = platforms
+
+    def __repr__(self) -> str:
+        return f"<CatalogGame(id={self.id}, name='{self.name}', year={self.year})>"
+
+
+class CatalogIndex:
+    """Записи снимка и индексы по id, порядку (name, year, id), платформе и году.
+
+    Меняется только синхронно, без await посередине, — запросы из того же event loop
+    не видят полуобновлённого состояния.
+    """
+
+    def __init__(self):
+        self.games: Dict[int, CatalogGame] = {}
+        self.ordered: List[CatalogGame] = []
+        self.by_platform: Dict[int, Set[int]] = {}
+        self.by_year: Dict[int, Set[int]] = {}
+        self.platform_ids: Dict[str, int] = {}
+        self.platform_names: Dict[int, str] = {}
+        # Сумма id для сверки с базой: GameRepository.get_games_fingerprint
+        self.id_sum = 0
+        # Годы и наборы платформ повторяются у тысяч игр — храним по одному экземпляру
+        self._years: Dict[int, int] = {}
+        self._platform_sets: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+    @classmethod
+    def build(cls, rows: Sequence[tuple], platforms: Dict[str, int]) -> "CatalogIndex":
+        index = cls()
+        index.set_platforms(platforms)
+        index.upsert(rows)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    @property
+    def fingerprint(self) -> Tuple[int, int]:
+        return len(self.games), self.id_sum
+
+    def set_platforms(self, platforms: Dict[str, int]) -> None:
+        self.platform_ids = dict(platforms)
+        self.platform_names = {platform_id: name for name, platform_id in platforms.items()}
+
+    def _add(self, game: CatalogGame) -> None:
+        self.games[game.id] = game
+        self.id_sum += game.id
+        self.by_year.setdefault(game.year, set()).add(game.id)
+        for platform_id in game.platforms:
+            self.by_platform.setdefault(platform_id, set()).add(game.id)
+
+    def _discard(self, game: CatalogGame) -> None:
+        del self.games[game.id]
+        self.id_sum -= game.id
+        self._unlink(self.by_year, game.year, game.id)
+        for platform_id in game.platforms:
+            self._unlink(self.by_platform, platform_id, game.id)
+
+    @staticmethod
+    def _unlink(index: Dict[int, Set[int]], key: int, game_id: int) -> None:
+        ids = index[key]
+        ids.discard(game_id)
+        if not ids:
+            del index[key]
+
+    def _position(self, game: CatalogGame) -> int:
+        return bisect.bisect_left(self.ordered, sort_key(game), key=sort_key)
+
+    def upsert(self, rows: Iterable[tuple]) -> int:
+        """Применяет строки GameRepository.get_catalog_rows; возвращает число изменённых игр."""
+        changed = []
+        for game_id, name, year, _, platform_ids in rows:
+            platforms = tuple(sorted(platform_ids or ()))
+            old = self.games.get(game_id)
+            if old is not None and (old.name, old.year, old.platforms) == (name, year, platforms):
+                continue
+            if old is not None:
+                self._discard(old)
+            year = self._years.setdefault(year, year)
+            game = CatalogGame(game_id, name, year, self._platform_sets.setdefault(platforms, platforms))
+            self._add(game)
+            changed.append((old, game))
+
+        if len(changed) > RESORT_THRESHOLD:
+            self.ordered = sorted(self.games.values(), key=sort_key)
+        else:
+            for old, game in changed:
+                if old is not None:
+                    del self.ordered[self._position(old)]
+                bisect.insort(self.ordered, game, key=sort_key)
+        return len(changed)
+
+    def retain(self, game_ids: Iterable[int]) -> int:
+        """Удаляет игры, которых больше нет в базе; возвращает число удалённых."""
+        removed = self.games.keys() - set(game_ids)
+        for game_id in removed:
+            self._discard(self.games[game_id])
+        if removed:
+            self.ordered = [game for game in self.ordered if game.id not in removed]
+        return len(removed)
+
+    def get(self, game_id: int) -> Optional[CatalogGame]:
+        return self.games.get(game_id)
+
+    def find_by_name(self, name: str) -> Optional[CatalogGame]:
+        position = bisect.bisect_left(self.ordered, (name,), key=sort_key)
+        if position < len(self.ordered) and self.ordered[position].name == name:
+            return self.ordered[position]
+        return None
+
+    def list_games(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, int, int]] = None,
+            platform: Optional[str] = None,
+            year_from: Optional[int] = None,
+            year_to: Optional[int] = None,
+    ) -> List[CatalogGame]:
+        platform_id = None
+        if platform:
+            platform_id = self.platform_ids.get(platform)
+            if platform_id is None:
+                return []
+
+        def matches(game: CatalogGame) -> bool:
+            return (
+                (platform_id is None or platform_id in game.platforms)
+                and (year_from is None or game.year >= year_from)
+                and (year_to is None or game.year <= year_to)
+            )
+
+        candidates, size = None, 0
+        if platform_id is not None:
+            candidates = self.by_platform.get(platform_id, ())
+            size = len(candidates)
+        if year_from is not None or year_to is not None:
+            years = [
+                self.by_year[year] for year in self.by_year
+                if (year_from is None or year >= year_from) and (year_to is None or year <= year_to)
+            ]
+            year_size = sum(map(len, years))
+            if candidates is None or year_size < size:
+                candidates, size = chain.from_iterable(years), year_size
+
+        # При k совпадениях скан по порядку читает ~limit * n / k записей, а отбор из
+        # кандидатов — k; редкий фильтр выгоднее обслужить индексом платформы или года
+        if candidates is not None and size * size <= limit * len(self.ordered):
+            games = (self.games[game_id] for game_id in candidates)
+            return heapq.nsmallest(
+                limit, (game for game in games if matches(game) and (after is None or sort_key(game) > after)),
+                key=sort_key,
+            )
+
+        ordered = self.ordered
+        found = []
+        start = bisect.bisect_right(ordered, after, key=sort_key) if after else 0
+        for position in range(start, len(ordered)):
+            game = ordered[position]
+            if matches(game):
+                found.append(game)
+                if len(found) == limit:
+                    break
+        return found
+
+
+class GameCatalog:
+    """Снимок каталога игр в памяти воркера для листинга и поиска по id без запросов к БД.
+
+    Первая загрузка и периодическая пересборка читают таблицу целиком, между ними —
+    только строки с updated_at новее водяного знака. Удаления видны по расхождению
+    числа и суммы id игр с базой. Данные отстают от базы не больше чем на CATALOG_REFRESH_INTERVAL.
+    """
+
+    def __init__(self):
+        self.index: Optional[CatalogIndex] = None
+        self.watermark: Optional[datetime] = None
+        self.loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    @property
+    def size(self) -> int:
+        return len(self.index) if self.index is not None else 0
+
+    def _advance(self, rows: Sequence[tuple]) -> None:
+        if rows:
+            newest = max(row[3] for row in rows)
+            self.watermark = max(newest, self.watermark) if self.watermark else newest
+
+    async def load(self) -> None:
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        async with async_session() as session:
+            rows = await GameRepository.get_catalog_rows(session)
+            platforms = await PlatformRepository.get_platform_map(session)
+        # Сборка сотни тысяч записей занимает заметное время — не держим на ней event loop
+        self.index = await asyncio.to_thread(CatalogIndex.build, rows, platforms)
+        self.watermark = None
+        self._advance(rows)
+        self.loaded_at = time.monotonic()
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            if self.index is None or time.monotonic() - self.loaded_at >= settings.CATALOG_RESYNC_INTERVAL:
+                await self._load()
+                return
+
+            since = self.watermark - timedelta(seconds=settings.CATALOG_REFRESH_OVERLAP) if self.watermark else None
+            async with async_session() as session:
+                rows = await GameRepository.get_catalog_rows(session, since)
+                fingerprint = await GameRepository.get_games_fingerprint(session)
+                known = self.index.platform_names
+                if any(platform_id not in known for row in rows for platform_id in row[4] or ()):
+                    self.index.set_platforms(await PlatformRepository.get_platform_map(session))
+                self.index.upsert(rows)
+                self._advance(rows)
+                if self.index.fingerprint != fingerprint:
+                    self.index.retain(await GameRepository.get_game_ids(session))
+
+    async def try_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except (SQLAlchemyError, OSError) as exc:
+            logger.warning("Game catalog refresh failed: %s", exc)
+
+    def refresh_after_commit(self, session: AsyncSession) -> None:
+        """Свои записи воркер видит сразу после коммита, не дожидаясь таймера."""
+        if self.ready:
+            after_commit(session, self.try_refresh)
+
+    def get(self, game_id: int) -> Optional[CatalogGame]:
+        return self.index.get(game_id)
+
+    def find_by_name(self, name: str) -> Optional[CatalogGame]:
+        return self.index.find_by_name(name)
+
+    def list_games(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, int, int]] = None,
+            platform: Optional[str] = None,
+            year_from: Optional[int] = None,
+            year_to: Optional[int] = None,
+    ) -> List[CatalogGame]:
+        return self.index.list_games(limit, after, platform, year_from, year_to)
+
+    def platform_names(self, game: CatalogGame) -> List[str]:
+        names = self.index.platform_names
+        return [names[platform_id] for platform_id in game.platforms if platform_id in names]
+
+
+catalog = container.register("game_catalog", GameCatalog)
+
+
+async def refresh_periodically(interval: int) -> None:
+    """Фоновая задача lifespan: подтягивает изменения каталога по водяному знаку."""
+    while True:
+        await asyncio.sleep(interval)
+        await catalog.try_refresh()
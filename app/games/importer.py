@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import csv
+import json
+import time
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+import anyio
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.container import container
+from app.core.database import unit_of_work
+from app.games.catalog import catalog
+from app.games.repository import GameRepository
+from app.games.platforms import platform_registry
+from app.games.schemas import GameCreate, GameImportError, GameImportReport
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+PLATFORM_SEPARATOR = "|"
+
+ParsedRow = Tuple[int, Union[dict, str]]
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[ParsedRow]:
+    # Колонки: name, year, description, platforms ("PS5|Xbox Series X")
+    reader = csv.DictReader(stream)
+    for row in reader:
+        platforms = row.get("platforms") or ""
+        yield reader.line_num, {
+            "name": (row.get("name") or "").strip(),
+            "year": row.get("year"),
+            "description": row.get("description") or None,
+            "platforms": [name.strip() for name in platforms.split(PLATFORM_SEPARATOR) if name.strip()] or None,
+        }
+
+
+def iter_jsonl_rows(stream: TextIO) -> Iterator[ParsedRow]:
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_num, f"Некорректный JSON: {exc.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_num, "Строка должна быть JSON-объектом"
+            continue
+        yield line_num, row
+
+
+def iter_rows(stream: TextIO, fmt: str) -> Iterator[ParsedRow]:
+    if fmt == "csv":
+        return iter_csv_rows(stream)
+    if fmt == "jsonl":
+        return iter_jsonl_rows(stream)
+    raise ValueError(f"Неподдерживаемый формат: {fmt}")
+
+
+def detect_format(filename: Optional[str]) -> str:
+    if filename and filename.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+class GameImporter:
+    def __init__(self, session: AsyncSession, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self.report = GameImportReport()
+        self._batch: List[Tuple[int, GameCreate]] = []
+
+    def _fail(self, row: int, error: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(GameImportError(row=row, error=error))
+
+    def _collect(self, rows: Iterator[ParsedRow]) -> bool:
+        """Читает, разбирает и валидирует строки до полной пачки; False — строки кончились.
+
+        Выполняется в потоке: чтение временного файла, парсинг и pydantic на десятках тысяч
+        строк иначе держали бы event loop. С _flush не пересекается — тот ждёт возврата.
+        """
+        for row_num, data in rows:
+            self.report.total += 1
+            if isinstance(data, str):
+                self._fail(row_num, data)
+                continue
+            try:
+                self._batch.append((row_num, GameCreate.model_validate(data)))
+            except ValidationError as exc:
+                self._fail(row_num, _validation_message(exc))
+                continue
+            if len(self._batch) >= self.batch_size:
+                return True
+        return False
+
+    async def run(self, rows: Iterable[ParsedRow]) -> GameImportReport:
+        started = time.perf_counter()
+        rows = iter(rows)
+        while await anyio.to_thread.run_sync(self._collect, rows):
+            await self._flush()
+        await self._flush()
+
+        self.report.elapsed = round(time.perf_counter() - started, 3)
+        if self.report.elapsed:
+            self.report.rows_per_sec = round(self.report.total / self.report.elapsed, 1)
+        return self.report
+
+    async def _flush(self) -> None:
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+
+        # Повтор (name, year) внутри одной пачки ломает ON CONFLICT DO UPDATE — оставляем последний
+        games = {(game.name, game.year): (row_num, game) for row_num, game in batch}
+        platform_names = sorted({name for _, game in games.values() for name in game.platforms or []})
+
+        try:
+            # Savepoint на пачку: ошибка откатывает только её, коммит — в unit_of_work
+            async with self.session.begin_nested():
+                platform_ids = await platform_registry.resolve_map(self.session, platform_names)
+                game_ids = await GameRepository.upsert_games(self.session, [
+                    {"name": game.name, "year": game.year, "description": game.description}
+                    for _, game in games.values()
+                ])
+                await GameRepository.add_game_platforms(self.session, [
+                    (game_ids[key], platform_ids[name])
+                    for key, (_, game) in games.items()
+                    for name in dict.fromkeys(game.platforms or [])
+                ])
+        except SQLAlchemyError as exc:
+            platform_registry.discard_pending(self.session)
+            error = f"Ошибка записи пачки: {exc.__class__.__name__}"
+            for row_num, _ in batch:
+                self._fail(row_num, error)
+            return
+
+        self.report.imported += len(batch)
+
+
+async def import_games_service(
+        session: AsyncSession,
+        stream: TextIO,
+        fmt: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+) -> GameImportReport:
+    catalog.refresh_after_commit(session)
+    return await GameImporter(session, batch_size).run(iter_rows(stream, fmt))
+
+
+async def main(path: str, fmt: Optional[str], batch_size: int) -> None:
+    async with unit_of_work() as session:
+        with open(path, encoding="utf-8", newline="") as stream:
+            report = await import_games_service(session, stream, fmt or detect_format(path), batch_size)
+    await container.aclose()
+
+    print(f"Rows: {report.total}, imported: {report.imported}, failed: {report.failed}")
+    print(f"Elapsed: {report.elapsed}s, {report.rows_per_sec} rows/sec")
+    for error in report.errors:
+        print(f"  row {error.row}: {error.error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Массовый импорт игр из CSV/JSONL")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.format, args.batch_size))
@@ -1,4 +1,5 @@
-from sqlalchemy import Integer, String, DateTime, func, ForeignKey, Table, Column, Text, UniqueConstraint
+from sqlalchemy import Integer, String, DateTime, func, ForeignKey, Table, Column, Text, UniqueConstraint, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from app.core.database import Base
 from datetime import datetime
@@ -7,7 +8,17 @@ from typing import List, Optional
 game_platform = Table(
     'game_platform', Base.metadata,
     Column('game_id', ForeignKey('games.id', ondelete='CASCADE'), primary_key=True),
-    Column('platform_id', ForeignKey('platforms.id', ondelete='CASCADE'), primary_key=True)
+    Column('platform_id', ForeignKey('platforms.id', ondelete='CASCADE'), primary_key=True),
+    Index('ix_game_platform_platform_id_game_id', 'platform_id', 'game_id')
+)
+
+SEARCH_CONFIG = "simple"
+# Порядок листинга — по байтам UTF-8, как сравнение str в Python: снимок каталога и база
+# сортируют одинаково при любой collation базы, и курсор одного пути годится для другого
+LISTING_COLLATION = "C"
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
 )
 
 
@@ -18,12 +29,20 @@ class Game(Base):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     year: Mapped[int] = mapped_column(Integer, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Поисковый вектор считает сама PostgreSQL; в обычных выборках не загружается
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        deferred=True,
+        deferred_raiseload=True
+    )
 
     platforms: Mapped[List["Platform"]] = relationship(
         "Platform",
         secondary=game_platform,
         back_populates="games",
-        lazy="selectin"
+        lazy="raise",
+        passive_deletes=True
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -40,12 +59,21 @@ class Game(Base):
 
     __table_args__ = (
         UniqueConstraint('name', 'year', name='uq_game_name_year'),
+        Index('ix_games_year_name_id', 'year', 'name', 'id'),
+        Index('ix_games_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_games_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        # Инкрементальное обновление снимка каталога: WHERE updated_at > водяной знак
+        Index('ix_games_updated_at', 'updated_at'),
     )
 
     def __repr__(self) -> str:
         return f"<Game(id={self.id}, name='{self.name}', year={self.year})>"
 
 
+# Keyset-пагинация листинга: GameRepository.list_games
+Index('ix_games_name_c_year_id', Game.name.collate(LISTING_COLLATION), Game.year, Game.id)
+
+
 class Platform(Base):
     __tablename__ = "platforms"
 
@@ -56,7 +84,8 @@ class Platform(Base):
         "Game",
         secondary=game_platform,
         back_populates="platforms",
-        lazy="selectin"
+        lazy="raise",
+        passive_deletes=True
     )
 
     created_at: Mapped[datetime] = mapped_column(
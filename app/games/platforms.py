@@ -0,0 +1,64 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import after_commit
+from app.games.repository import PlatformRepository
+from typing import Dict, Iterable, List, Optional
+
+PENDING_KEY = "pending_platforms"
+
+
+class PlatformRegistry:
+    """Кэш соответствия имя платформы → id в памяти процесса.
+
+    Найденные в транзакции id попадают в общий кэш только после её коммита:
+    платформа, вставленная в откатившейся транзакции, не должна остаться в реестре.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def warm(self, session: AsyncSession) -> None:
+        self._ids = await PlatformRepository.get_platform_map(session)
+
+    def invalidate(self) -> None:
+        self._ids = {}
+
+    def _pending(self, session: AsyncSession) -> Dict[str, int]:
+        pending = session.info.get(PENDING_KEY)
+        if pending is None:
+            pending = session.info[PENDING_KEY] = {}
+
+            async def publish():
+                self._ids.update(session.info.pop(PENDING_KEY, {}))
+
+            after_commit(session, publish)
+        return pending
+
+    def discard_pending(self, session: AsyncSession) -> None:
+        """Вызывается после отката savepoint: id из него могли стать недействительными."""
+        pending = session.info.get(PENDING_KEY)
+        if pending:
+            pending.clear()
+
+    async def resolve_map(self, session: AsyncSession, names: Iterable[str]) -> Dict[str, int]:
+        names = list(dict.fromkeys(name for name in names if name))
+        pending = session.info.get(PENDING_KEY, {})
+        missing = [name for name in names if name not in self._ids and name not in pending]
+        if missing:
+            pending = self._pending(session)
+            pending.update(await PlatformRepository.resolve_platforms(session, missing))
+        return {name: self._ids[name] if name in self._ids else pending[name] for name in names}
+
+    async def find(self, session: AsyncSession, name: str) -> Optional[int]:
+        """Id существующей платформы; в отличие от resolve, новую не создаёт."""
+        if name in self._ids:
+            return self._ids[name]
+        return await PlatformRepository.get_platform_id(session, name)
+
+    async def resolve(self, session: AsyncSession, names: Iterable[str]) -> List[int]:
+        return list((await self.resolve_map(session, names)).values())
+
+
+platform_registry = PlatformRegistry()
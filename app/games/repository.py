@@ -1,39 +1,267 @@
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, func, delete, literal, cast, Float
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.games.models import Game
-from typing import List, Optional
+from sqlalchemy.orm import load_only, selectinload, raiseload
+from app.games.models import Game, Platform, game_platform, SEARCH_CONFIG, LISTING_COLLATION
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Связи Game <-> Platform объявлены с lazy="raise": каждый метод репозитория сам
+# решает, что подгружать, и случайный каскад selectin больше невозможен.
+GAME_SUMMARY_COLUMNS = (Game.id, Game.name, Game.year)
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=8, MaxFragments=2"
+
+
+def game_load_options(platforms: bool = False, summary: bool = False) -> list:
+    options = []
+    if summary:
+        options.append(load_only(*GAME_SUMMARY_COLUMNS, raiseload=True))
+    if platforms:
+        options.append(
+            selectinload(Game.platforms)
+            .load_only(Platform.id, Platform.name, raiseload=True)
+            .raiseload(Platform.games)
+        )
+    else:
+        options.append(raiseload(Game.platforms))
+    return options
 
 
 class GameRepository:
     @staticmethod
-    async def create_game(session: AsyncSession, game: Game) -> Game:
+    async def create_game(
+            session: AsyncSession,
+            game: Game,
+            platform_ids: Optional[Sequence[int]] = None,
+    ) -> Game:
         session.add(game)
-        await session.commit()
-        await session.refresh(game)
+        await session.flush()
+        if platform_ids:
+            await GameRepository.set_game_platforms(session, game.id, platform_ids)
         return game
 
     @staticmethod
-    async def get_game_by_id(session: AsyncSession, game_id: int) -> Optional[Game]:
-        result = await session.execute(select(Game).where(Game.id == game_id))
+    async def get_game_by_id(
+            session: AsyncSession,
+            game_id: int,
+            with_platforms: bool = True,
+    ) -> Optional[Game]:
+        result = await session.execute(
+            select(Game).options(*game_load_options(platforms=with_platforms)).where(Game.id == game_id)
+        )
         return result.scalars().first()
 
     @staticmethod
-    async def get_all_games(session: AsyncSession) -> List[Game]:
-        result = await session.execute(select(Game))
+    async def get_all_games(
+            session: AsyncSession,
+            with_platforms: bool = False,
+            summary: bool = False,
+    ) -> List[Game]:
+        result = await session.execute(
+            select(Game).options(*game_load_options(platforms=with_platforms, summary=summary))
+        )
         return result.scalars().all()
 
     @staticmethod
-    async def update_game(session: AsyncSession, game: Game) -> Game:
-        await session.commit()
-        await session.refresh(game)
+    async def get_platform_ids(session: AsyncSession, game_ids: Sequence[int]) -> Dict[int, List[int]]:
+        # Только id платформ — без построения ORM-объектов Platform
+        platform_ids: Dict[int, List[int]] = {game_id: [] for game_id in game_ids}
+        if not game_ids:
+            return platform_ids
+        result = await session.execute(
+            select(game_platform.c.game_id, game_platform.c.platform_id)
+            .where(game_platform.c.game_id.in_(game_ids))
+        )
+        for game_id, platform_id in result:
+            platform_ids[game_id].append(platform_id)
+        return platform_ids
+
+    @staticmethod
+    async def get_catalog_rows(session: AsyncSession, changed_since: Optional[datetime] = None) -> list:
+        """Строки для снимка каталога: (id, name, year, updated_at, [platform_id, ...]) — без ORM-объектов."""
+        platform_ids = func.array_agg(game_platform.c.platform_id).filter(game_platform.c.platform_id.is_not(None))
+        query = (
+            select(Game.id, Game.name, Game.year, Game.updated_at, platform_ids)
+            .outerjoin(game_platform, game_platform.c.game_id == Game.id)
+            .group_by(Game.id)
+        )
+        if changed_since is not None:
+            query = query.where(Game.updated_at > changed_since)
+        result = await session.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def get_games_fingerprint(session: AsyncSession) -> Tuple[int, int]:
+        """(число игр, сумма id): вставка и удаление за один интервал меняют сумму, даже если число то же."""
+        result = await session.execute(select(func.count(), func.coalesce(func.sum(Game.id), 0)))
+        count, id_sum = result.one()
+        return count, int(id_sum)
+
+    @staticmethod
+    async def get_game_ids(session: AsyncSession) -> List[int]:
+        result = await session.execute(select(Game.id))
+        return result.scalars().all()
+
+    @staticmethod
+    async def list_games(
+            session: AsyncSession,
+            limit: int,
+            after: Optional[Tuple[str, int, int]] = None,
+            platform: Optional[str] = None,
+            year_from: Optional[int] = None,
+            year_to: Optional[int] = None,
+    ) -> List[Game]:
+        # Keyset-пагинация по (name, year, id): стоимость не зависит от глубины страницы.
+        # name в collation "C" — тот же порядок, что у снимка каталога, и индекс ix_games_name_c_year_id
+        name = Game.name.collate(LISTING_COLLATION)
+        query = (
+            select(Game)
+            .options(*game_load_options(platforms=True, summary=True))
+            .order_by(name, Game.year, Game.id)
+            .limit(limit)
+        )
+        if after:
+            query = query.where(tuple_(name, Game.year, Game.id) > tuple_(*after))
+        if platform:
+            query = query.where(Game.platforms.any(Platform.name == platform))
+        if year_from is not None:
+            query = query.where(Game.year >= year_from)
+        if year_to is not None:
+            query = query.where(Game.year <= year_to)
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def search_games(session: AsyncSession, query: str, limit: int) -> List[dict]:
+        # Полнотекстовый поиск по tsvector + нечёткое совпадение названия через pg_trgm
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = (
+            func.ts_rank_cd(Game.search_vector, ts_query) + func.similarity(Game.name, query)
+        ).label("rank")
+        matches = (
+            select(Game.id, Game.name, Game.year, Game.description, rank)
+            .where(Game.search_vector.op("@@")(ts_query) | Game.name.op("%")(query))
+            .order_by(rank.desc(), Game.id)
+            .limit(limit)
+            .subquery()
+        )
+        # ts_headline дорогой — считаем его только для уже отобранной страницы
+        snippet = func.ts_headline(
+            SEARCH_CONFIG, func.coalesce(matches.c.description, matches.c.name), ts_query, HEADLINE_OPTIONS
+        ).label("snippet")
+        result = await session.execute(
+            select(matches.c.id, matches.c.name, matches.c.year, cast(matches.c.rank, Float).label("rank"), snippet)
+            .order_by(matches.c.rank.desc(), matches.c.id)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    async def autocomplete_games(session: AsyncSession, prefix: str, limit: int) -> List[dict]:
+        # ILIKE 'prefix%' обслуживается trigram-индексом ix_games_name_trgm
+        rank = func.similarity(Game.name, prefix).label("rank")
+        result = await session.execute(
+            select(Game.id, Game.name, Game.year, rank, literal(None).label("snippet"))
+            .where(Game.name.istartswith(prefix, autoescape=True))
+            .order_by(rank.desc(), Game.name, Game.id)
+            .limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    async def update_game(
+            session: AsyncSession,
+            game: Game,
+            platform_ids: Optional[Sequence[int]] = None,
+    ) -> Game:
+        if platform_ids is not None:
+            # Связи платформ не меняют строку games — отмечаем изменение сами, чтобы его увидел каталог
+            game.updated_at = func.now()
+        await session.flush()
+        if platform_ids is not None:
+            await GameRepository.set_game_platforms(session, game.id, platform_ids)
         return game
 
     @staticmethod
-    async def get_game_by_name(session: AsyncSession, name: str) -> Optional[Game]:
-        result = await session.execute(select(Game).where(Game.name == name))
+    async def get_game_by_name(
+            session: AsyncSession,
+            name: str,
+            year: Optional[int] = None,
+            with_platforms: bool = False,
+    ) -> Optional[Game]:
+        stmt = select(Game).options(*game_load_options(platforms=with_platforms)).where(Game.name == name)
+        if year is not None:
+            stmt = stmt.where(Game.year == year)
+        result = await session.execute(stmt)
         return result.scalars().first()
 
     @staticmethod
     async def delete_game(session: AsyncSession, game: Game) -> None:
         await session.delete(game)
-        await session.commit()
+        await session.flush()
+
+    @staticmethod
+    async def upsert_games(session: AsyncSession, rows: Sequence[dict]) -> Dict[Tuple[str, int], int]:
+        if not rows:
+            return {}
+        stmt = insert(Game).values(list(rows))
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_game_name_year",
+            set_={"description": stmt.excluded.description, "updated_at": func.now()},
+        ).returning(Game.id, Game.name, Game.year)
+        result = await session.execute(stmt)
+        return {(name, year): game_id for game_id, name, year in result}
+
+    @staticmethod
+    async def add_game_platforms(session: AsyncSession, pairs: Sequence[Tuple[int, int]]) -> None:
+        if not pairs:
+            return
+        stmt = insert(game_platform).values(
+            [{"game_id": game_id, "platform_id": platform_id} for game_id, platform_id in pairs]
+        ).on_conflict_do_nothing()
+        await session.execute(stmt)
+
+    @staticmethod
+    async def set_game_platforms(session: AsyncSession, game_id: int, platform_ids: Sequence[int]) -> None:
+        # Связи пишутся только по id — объекты Platform не загружаются
+        await session.execute(
+            delete(game_platform).where(
+                game_platform.c.game_id == game_id,
+                game_platform.c.platform_id.not_in(platform_ids),
+            )
+        )
+        await GameRepository.add_game_platforms(session, [(game_id, platform_id) for platform_id in platform_ids])
+
+
+class PlatformRepository:
+    @staticmethod
+    async def get_platform_map(session: AsyncSession) -> Dict[str, int]:
+        result = await session.execute(select(Platform.name, Platform.id))
+        return dict(result.all())
+
+    @staticmethod
+    async def get_platform_id(session: AsyncSession, name: str) -> Optional[int]:
+        return await session.scalar(select(Platform.id).where(Platform.name == name))
+
+    @staticmethod
+    async def resolve_platforms(session: AsyncSession, names: Sequence[str]) -> Dict[str, int]:
+        # Один запрос: вставка новых имён + выборка уже существующих
+        if not names:
+            return {}
+        inserted = (
+            insert(Platform)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=[Platform.name])
+            .returning(Platform.id, Platform.name)
+            .cte("inserted")
+        )
+        stmt = select(inserted.c.name, inserted.c.id).union_all(
+            select(Platform.name, Platform.id).where(Platform.name.in_(names))
+        )
+        resolved = dict((await session.execute(stmt)).all())
+
+        # Строки, вставленные параллельной транзакцией, не видны в снимке CTE — добираем их
+        missing = [name for name in names if name not in resolved]
+        if missing:
+            result = await session.execute(select(Platform.name, Platform.id).where(Platform.name.in_(missing)))
+            resolved.update(result.all())
+        return resolved
@@ -1,18 +1,69 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, Request, File, UploadFile, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_session, get_read_session
+from app.games.schemas import GameCreate, GamePage, GameImportReport, GameListItem, GameSearchResult
+from app.games.service import (
+    create_game_service, get_game_service, list_games_service, search_games_service, MAX_PAGE_SIZE, MAX_SEARCH_RESULTS
+)
+from app.games.importer import import_games_service, detect_format
+from typing import Literal, Optional
+import io
 
 router = APIRouter()
 
 
-@router.get("/games")
-async def get_games():
-    return {"message": "List of games will be here"}
+@router.get("/games", response_model=GamePage)
+async def get_games(
+        cursor: Optional[str] = None,
+        limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+        platform: Optional[str] = None,
+        year_from: Optional[int] = Query(None, ge=1990, le=2100),
+        year_to: Optional[int] = Query(None, ge=1990, le=2100),
+        session: AsyncSession = Depends(get_read_session),
+):
+    return await list_games_service(
+        session, cursor=cursor, limit=limit, platform=platform, year_from=year_from, year_to=year_to
+    )
 
 
-@router.post("/games")
-async def create_game():
-    return {"message": "Game created successfully"}
+@router.get("/games/search", response_model=GameSearchResult)
+async def search_games(
+        q: str = Query(..., min_length=2, max_length=100),
+        mode: Literal["full", "prefix"] = "full",
+        limit: int = Query(10, ge=1, le=MAX_SEARCH_RESULTS),
+        session: AsyncSession = Depends(get_read_session),
+):
+    return await search_games_service(session, q, mode=mode, limit=limit)
 
 
-@router.get("/games/{game_id}")
-async def get_game(game_id: int):
-    return {"message": f"Details of game with ID {game_id}"}
+@router.post("/games/import", response_model=GameImportReport)
+async def import_games(
+        request: Request,
+        file: UploadFile = File(...),
+        session: AsyncSession = Depends(get_session),
+):
+    if not request.state.user.is_superuser:
+        raise HTTPException(403, "Доступ запрещен!")
+    # Файл уже во временном хранилище Starlette — читаем его построчно, не целиком;
+    # чтение и разбор идут в потоке (GameImporter._collect), а не в event loop
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return await import_games_service(session, stream, detect_format(file.filename))
+    finally:
+        stream.detach()
+
+
+@router.post("/games", response_model=GameListItem, status_code=status.HTTP_201_CREATED)
+async def create_game(
+        request: Request,
+        game_data: GameCreate,
+        session: AsyncSession = Depends(get_session),
+):
+    if not request.state.user.is_superuser:
+        raise HTTPException(403, "Доступ запрещен!")
+    return await create_game_service(session, game_data)
+
+
+@router.get("/games/{game_id}", response_model=GameListItem)
+async def get_game(game_id: int, session: AsyncSession = Depends(get_read_session)):
+    return await get_game_service(session, game_id)
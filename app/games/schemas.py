@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from datetime import date
-from typing import Optional
+from typing import Literal, Optional
 
 
 class GameBase(BaseModel):
@@ -26,4 +26,51 @@ class GameRead(GameBase):
     created_at: date
     updated_at: date
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GameListItem(BaseModel):
+    id: int
+    name: str
+    year: int
+    platforms: list[str] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("platforms", mode="before")
+    @classmethod
+    def platform_names(cls, value):
+        return [getattr(platform, "name", platform) for platform in value or []]
+
+
+class GamePage(BaseModel):
+    items: list[GameListItem]
+    next_cursor: Optional[str] = None
+
+
+class GameImportError(BaseModel):
+    row: int
+    error: str
+
+
+class GameImportReport(BaseModel):
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    rows_per_sec: float = 0.0
+    errors: list[GameImportError] = []
+
+
+class GameSearchHit(BaseModel):
+    id: int
+    name: str
+    year: int
+    rank: float
+    snippet: Optional[str] = None
+
+
+class GameSearchResult(BaseModel):
+    query: str
+    mode: Literal["full", "prefix"]
+    items: list[GameSearchHit]
@@ -1,36 +1,135 @@
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.games.models import Game, Platform
-from app.games.schemas import GameCreate, GameUpdate
+from app.games.models import Game
+from app.games.schemas import GameCreate, GameUpdate, GameListItem, GamePage, GameSearchHit, GameSearchResult
 from app.games.repository import GameRepository
+from app.games.platforms import platform_registry
+from app.games.catalog import CatalogGame, catalog
+from typing import Optional, Union
+import base64
+import binascii
+import json
 
+MAX_PAGE_SIZE = 100
+MAX_SEARCH_RESULTS = 50
+MIN_SEARCH_LENGTH = 2
 
-async def create_game_service(session: AsyncSession, game_data: GameCreate) -> Game:
-    if await GameRepository.get_game_by_name(session, game_data.name):
-        raise HTTPException(409, "Игра с таким названием уже существует!")
+
+def encode_cursor(game: Union[Game, CatalogGame]) -> str:
+    raw = json.dumps([game.name, game.year, game.id], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, year, game_id = json.loads(raw)
+        return str(name), int(year), int(game_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(400, "Некорректный курсор страницы!")
+
+
+async def list_games_service(
+        session: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        platform: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+) -> GamePage:
+    if year_from is not None and year_to is not None and year_from > year_to:
+        raise HTTPException(400, "Начальный год не может быть больше конечного!")
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+    if catalog.ready:
+        games = catalog.list_games(limit + 1, after=after, platform=platform, year_from=year_from, year_to=year_to)
+        items = [catalog_item(game) for game in games[:limit]]
+    else:
+        games = await GameRepository.list_games(
+            session, limit + 1, after=after, platform=platform, year_from=year_from, year_to=year_to
+        )
+        items = [GameListItem.model_validate(game) for game in games[:limit]]
+
+    next_cursor = encode_cursor(games[limit - 1]) if len(games) > limit else None
+    return GamePage(items=items, next_cursor=next_cursor)
+
+
+def catalog_item(game: CatalogGame) -> GameListItem:
+    return GameListItem(id=game.id, name=game.name, year=game.year, platforms=catalog.platform_names(game))
+
+
+async def get_game_service(session: AsyncSession, game_id: int) -> GameListItem:
+    if catalog.ready:
+        game = catalog.get(game_id)
+        if game:
+            return catalog_item(game)
+    # Промах снимка — ещё не 404: игру могли создать в другом воркере после последнего обновления
+    game = await GameRepository.get_game_by_id(session, game_id, with_platforms=True)
+    if not game:
+        raise HTTPException(404, "Игра не найдена!")
+    return GameListItem.model_validate(game)
+
+
+async def search_games_service(
+        session: AsyncSession,
+        query: str,
+        mode: str = "full",
+        limit: int = 10,
+) -> GameSearchResult:
+    query = " ".join(query.split())
+    if len(query) < MIN_SEARCH_LENGTH:
+        raise HTTPException(400, "Поисковый запрос должен содержать не менее 2 символов!")
+
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    if mode == "prefix":
+        rows = await GameRepository.autocomplete_games(session, query, limit)
+    else:
+        rows = await GameRepository.search_games(session, query, limit)
+
+    return GameSearchResult(
+        query=query,
+        mode=mode,
+        items=[GameSearchHit.model_validate(row) for row in rows]
+    )
+
+
+async def create_game_service(session: AsyncSession, game_data: GameCreate) -> GameListItem:
+    # Уникальна пара (name, year), как в uq_game_name_year и ключе upsert импорта
+    if await GameRepository.get_game_by_name(session, game_data.name, year=game_data.year):
+        raise HTTPException(409, "Игра с таким названием и годом уже существует!")
     if len(game_data.name) < 3:
         raise HTTPException(400, "Название игры должно содержать не менее 3 символов!")
 
     game = Game(
         name=game_data.name,
+        year=game_data.year,
         description=game_data.description,
-        release_date=game_data.release_date,
-        platforms=[Platform(name=platform) for platform in game_data.platforms]
     )
-
-    return await GameRepository.create_game(session, game)
+    platforms = await platform_registry.resolve_map(session, game_data.platforms or [])
+    try:
+        game = await GameRepository.create_game(session, game, list(platforms.values()))
+    except IntegrityError:
+        # Ту же игру успел создать параллельный запрос
+        raise HTTPException(409, "Игра с таким названием и годом уже существует!")
+    catalog.refresh_after_commit(session)
+    return GameListItem(id=game.id, name=game.name, year=game.year, platforms=list(platforms))
 
 
 async def update_game_service(session: AsyncSession, game_id: int, game_data: GameUpdate) -> Game:
-    game = await GameRepository.get_game_by_id(session, game_id)
+    game = await GameRepository.get_game_by_id(session, game_id, with_platforms=False)
 
     if not game:
         raise HTTPException(404, "Игра не найдена!")
 
     update_data = game_data.model_dump(exclude_unset=True)
+    platforms = update_data.pop("platforms", None)
     for field, value in update_data.items():
         setattr(game, field, value)
-    if "platforms" in update_data:
-        game.platforms = [Platform(name=platform) for platform in update_data["platforms"]]
 
-    return await GameRepository.update_game(session, game)
+    platform_ids = None
+    if platforms is not None:
+        platform_ids = await platform_registry.resolve(session, platforms)
+    catalog.refresh_after_commit(session)
+    return await GameRepository.update_game(session, game, platform_ids)
@@ -0,0 +1,85 @@
+from sqlalchemy import (
+    Integer, String, DateTime, func, ForeignKey, ForeignKeyConstraint, CheckConstraint, Index, text
+)
+from sqlalchemy.orm import mapped_column, Mapped
+from app.core.database import Base
+from datetime import datetime
+from typing import Optional
+
+RESERVATION_ACTIVE = "active"
+RESERVATION_RELEASED = "released"
+RESERVATION_FULFILLED = "fulfilled"
+
+
+class StockItem(Base):
+    """Остаток одной позиции (игра на платформе).
+
+    quantity — штук на складе, reserved — из них отложено под резервы; свободно quantity - reserved.
+    Ограничения проверяет сама PostgreSQL: даже ошибочный UPDATE не уведёт остаток в минус.
+    """
+
+    __tablename__ = "stock_items"
+
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
+    platform_id: Mapped[int] = mapped_column(ForeignKey("platforms.id", ondelete="CASCADE"), primary_key=True)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    reserved: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+    __table_args__ = (
+        CheckConstraint("quantity >= 0", name="ck_stock_items_quantity"),
+        CheckConstraint("reserved >= 0 AND reserved <= quantity", name="ck_stock_items_reserved"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<StockItem(game_id={self.game_id}, platform_id={self.platform_id}, quantity={self.quantity})>"
+
+
+class Reservation(Base):
+    __tablename__ = "stock_reservations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    game_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    platform_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, server_default=RESERVATION_ACTIVE)
+    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["game_id", "platform_id"], ["stock_items.game_id", "stock_items.platform_id"], ondelete="CASCADE"
+        ),
+        CheckConstraint("quantity > 0", name="ck_stock_reservations_quantity"),
+        # Очередь сборки: активные резервы по порядку, без закрытых
+        Index(
+            "ix_stock_reservations_active_id", "id",
+            postgresql_where=text(f"status = '{RESERVATION_ACTIVE}'"),
+        ),
+        Index("ix_stock_reservations_game_id_platform_id", "game_id", "platform_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Reservation(id={self.id}, game_id={self.game_id}, quantity={self.quantity}, status='{self.status}')>"
@@ -0,0 +1,200 @@
+from sqlalchemy import select, update, func, literal, bindparam, Integer, String
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.games.models import Platform
+from app.inventory.models import (
+    StockItem, Reservation, RESERVATION_ACTIVE, RESERVATION_RELEASED, RESERVATION_FULFILLED
+)
+from typing import List, Optional
+
+# Все изменения остатка — условные UPDATE относительно текущего значения в одном запросе:
+# между чтением и записью нет окна, в котором параллельный кассир увидит старый остаток.
+stock_table = StockItem.__table__
+reservation_table = Reservation.__table__
+RESERVATION_COLUMNS = (
+    reservation_table.c.id,
+    reservation_table.c.game_id,
+    reservation_table.c.platform_id,
+    reservation_table.c.quantity,
+    reservation_table.c.status,
+    reservation_table.c.user_id,
+)
+
+
+def stock_matches(source) -> list:
+    return [stock_table.c.game_id == source.c.game_id, stock_table.c.platform_id == source.c.platform_id]
+
+
+class InventoryRepository:
+    @staticmethod
+    async def get_stock(session: AsyncSession, game_id: int) -> list:
+        result = await session.execute(
+            select(
+                Platform.name.label("platform"),
+                StockItem.quantity,
+                StockItem.reserved,
+                (StockItem.quantity - StockItem.reserved).label("available"),
+            )
+            .join(Platform, Platform.id == StockItem.platform_id)
+            .where(StockItem.game_id == game_id)
+            .order_by(Platform.name)
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_stock_item(session: AsyncSession, game_id: int, platform_id: int) -> Optional[StockItem]:
+        return await session.get(StockItem, (game_id, platform_id))
+
+    @staticmethod
+    async def get_reservation(session: AsyncSession, reservation_id: int) -> Optional[Reservation]:
+        return await session.get(Reservation, reservation_id)
+
+    @staticmethod
+    async def restock(session: AsyncSession, game_id: int, platform_id: int, quantity: int):
+        stmt = insert(stock_table).values(game_id=game_id, platform_id=platform_id, quantity=quantity)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[stock_table.c.game_id, stock_table.c.platform_id],
+            set_={"quantity": stock_table.c.quantity + stmt.excluded.quantity, "updated_at": func.now()},
+        ).returning(
+            stock_table.c.quantity,
+            stock_table.c.reserved,
+            (stock_table.c.quantity - stock_table.c.reserved).label("available"),
+        )
+        return (await session.execute(stmt)).first()
+
+    @staticmethod
+    async def reserve(
+            session: AsyncSession,
+            game_id: int,
+            platform_id: int,
+            quantity: int,
+            user_id: Optional[int] = None,
+    ):
+        """Резерв, если свободного остатка хватает; None — не хватает или позиции нет.
+
+        Списание и запись резерва — один запрос (data-modifying CTE). При гонке за строку
+        PostgreSQL перепроверяет условие на свежей версии строки, поэтому перепродажи нет.
+        """
+        taken = (
+            update(stock_table)
+            .where(
+                stock_table.c.game_id == game_id,
+                stock_table.c.platform_id == platform_id,
+                stock_table.c.quantity - stock_table.c.reserved >= quantity,
+            )
+            .values(reserved=stock_table.c.reserved + quantity, updated_at=func.now())
+            .returning(
+                stock_table.c.game_id,
+                stock_table.c.platform_id,
+                (stock_table.c.quantity - stock_table.c.reserved).label("available"),
+            )
+            .cte("taken")
+        )
+        created = (
+            insert(reservation_table)
+            .from_select(
+                ["game_id", "platform_id", "quantity", "status", "user_id"],
+                select(
+                    taken.c.game_id,
+                    taken.c.platform_id,
+                    literal(quantity, Integer),
+                    literal(RESERVATION_ACTIVE, String),
+                    literal(user_id, Integer),
+                ),
+            )
+            .returning(*RESERVATION_COLUMNS)
+            .cte("created")
+        )
+        result = await session.execute(select(created, taken.c.available))
+        return result.first()
+
+    @staticmethod
+    async def close_reservation(
+            session: AsyncSession,
+            reservation_id: int,
+            status: str,
+            user_id: Optional[int] = None,
+    ):
+        """Снимает (released) или выдаёт (fulfilled) активный резерв; None — резерв уже закрыт или не найден.
+
+        С user_id закрывается только резерв этого пользователя — проверка владельца в том же UPDATE.
+        """
+        conditions = [reservation_table.c.id == reservation_id, reservation_table.c.status == RESERVATION_ACTIVE]
+        if user_id is not None:
+            conditions.append(reservation_table.c.user_id == user_id)
+        closed = (
+            update(reservation_table)
+            .where(*conditions)
+            .values(status=status, updated_at=func.now())
+            .returning(*RESERVATION_COLUMNS)
+            .cte("closed")
+        )
+        values = {"reserved": stock_table.c.reserved - closed.c.quantity, "updated_at": func.now()}
+        if status == RESERVATION_FULFILLED:
+            # Выданный товар уходит со склада вместе с резервом
+            values["quantity"] = stock_table.c.quantity - closed.c.quantity
+        stock = (
+            update(stock_table)
+            .where(*stock_matches(closed))
+            .values(values)
+            .returning((stock_table.c.quantity - stock_table.c.reserved).label("available"))
+            .cte("stock")
+        )
+        result = await session.execute(select(closed, stock.c.available))
+        return result.first()
+
+    @staticmethod
+    async def release(session: AsyncSession, reservation_id: int, user_id: Optional[int] = None):
+        return await InventoryRepository.close_reservation(session, reservation_id, RESERVATION_RELEASED, user_id)
+
+    @staticmethod
+    async def fulfil(session: AsyncSession, reservation_id: int):
+        return await InventoryRepository.close_reservation(session, reservation_id, RESERVATION_FULFILLED)
+
+    @staticmethod
+    async def pick_reservations(session: AsyncSession, limit: int) -> List:
+        """Выдаёт пачку самых старых активных резервов.
+
+        FOR UPDATE SKIP LOCKED: параллельные сборщики получают непересекающиеся пачки
+        и не ждут друг друга. Остатки затем списываются по позициям в порядке ключа,
+        чтобы два сборщика не захватили строки stock_items крест-накрест (deadlock).
+        """
+        picked = (
+            select(reservation_table.c.id)
+            .where(reservation_table.c.status == RESERVATION_ACTIVE)
+            .order_by(reservation_table.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("picked")
+        )
+        result = await session.execute(
+            update(reservation_table)
+            .where(reservation_table.c.id.in_(select(picked.c.id)))
+            .values(status=RESERVATION_FULFILLED, updated_at=func.now())
+            .returning(*RESERVATION_COLUMNS)
+        )
+        reservations = sorted(result.all(), key=lambda row: row.id)
+        if not reservations:
+            return []
+
+        totals = {}
+        for row in reservations:
+            key = (row.game_id, row.platform_id)
+            totals[key] = totals.get(key, 0) + row.quantity
+        await session.execute(
+            update(stock_table)
+            .where(
+                stock_table.c.game_id == bindparam("item_game_id"),
+                stock_table.c.platform_id == bindparam("item_platform_id"),
+            )
+            .values(
+                quantity=stock_table.c.quantity - bindparam("picked"),
+                reserved=stock_table.c.reserved - bindparam("picked"),
+                updated_at=func.now(),
+            ),
+            [
+                {"item_game_id": game_id, "item_platform_id": platform_id, "picked": picked_quantity}
+                for (game_id, platform_id), picked_quantity in sorted(totals.items())
+            ],
+        )
+        return reservations
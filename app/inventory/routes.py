@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, Query, Request, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_session, get_read_session
+from app.inventory.schemas import StockChange, StockRead, ReservationRead
+from app.inventory.service import (
+    get_stock_service, restock_service, reserve_service, release_reservation_service,
+    fulfil_reservation_service, pick_reservations_service, MAX_PICK_BATCH
+)
+from typing import List
+
+router = APIRouter()
+
+
+def require_superuser(request: Request) -> None:
+    if not request.state.user.is_superuser:
+        raise HTTPException(403, "Доступ запрещен!")
+
+
+@router.post("/inventory/reservations/pick", response_model=List[ReservationRead])
+async def pick_reservations(
+        request: Request,
+        limit: int = Query(20, ge=1, le=MAX_PICK_BATCH),
+        session: AsyncSession = Depends(get_session),
+):
+    require_superuser(request)
+    return await pick_reservations_service(session, limit)
+
+
+@router.post("/inventory/reservations/{reservation_id}/release", response_model=ReservationRead)
+async def release_reservation(
+        request: Request,
+        reservation_id: int,
+        session: AsyncSession = Depends(get_session),
+):
+    # Свой резерв снимает владелец, любой — администратор
+    user = request.state.user
+    return await release_reservation_service(session, reservation_id, user_id=None if user.is_superuser else user.id)
+
+
+@router.post("/inventory/reservations/{reservation_id}/fulfil", response_model=ReservationRead)
+async def fulfil_reservation(
+        request: Request,
+        reservation_id: int,
+        session: AsyncSession = Depends(get_session),
+):
+    require_superuser(request)
+    return await fulfil_reservation_service(session, reservation_id)
+
+
+@router.get("/inventory/{game_id}", response_model=List[StockRead])
+async def get_stock(game_id: int, session: AsyncSession = Depends(get_read_session)):
+    return await get_stock_service(session, game_id)
+
+
+@router.post("/inventory/{game_id}/restock", response_model=StockRead)
+async def restock(
+        request: Request,
+        game_id: int,
+        stock_data: StockChange,
+        session: AsyncSession = Depends(get_session),
+):
+    require_superuser(request)
+    return await restock_service(session, game_id, stock_data)
+
+
+@router.post("/inventory/{game_id}/reservations", response_model=ReservationRead, status_code=status.HTTP_201_CREATED)
+async def reserve(
+        request: Request,
+        game_id: int,
+        stock_data: StockChange,
+        session: AsyncSession = Depends(get_session),
+):
+    return await reserve_service(session, game_id, stock_data, user_id=request.state.user.id)
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Literal, Optional
+
+
+class StockChange(BaseModel):
+    platform: str = Field(min_length=1, max_length=100)
+    quantity: int = Field(ge=1, le=10_000)
+
+
+class StockRead(BaseModel):
+    platform: str
+    quantity: int
+    reserved: int
+    available: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReservationRead(BaseModel):
+    id: int
+    game_id: int
+    platform_id: int
+    quantity: int
+    status: Literal["active", "released", "fulfilled"]
+    user_id: Optional[int] = None
+    # Свободный остаток позиции сразу после операции
+    available: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,81 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.games.platforms import platform_registry
+from app.inventory.repository import InventoryRepository
+from app.inventory.schemas import StockChange, StockRead, ReservationRead
+from typing import List, NoReturn, Optional
+
+MAX_PICK_BATCH = 100
+
+
+async def get_platform_id(session: AsyncSession, name: str) -> int:
+    platform_id = await platform_registry.find(session, name)
+    if platform_id is None:
+        raise HTTPException(404, "Платформа не найдена!")
+    return platform_id
+
+
+async def get_stock_service(session: AsyncSession, game_id: int) -> List[StockRead]:
+    rows = await InventoryRepository.get_stock(session, game_id)
+    return [StockRead.model_validate(row) for row in rows]
+
+
+async def restock_service(session: AsyncSession, game_id: int, stock_data: StockChange) -> StockRead:
+    platform_id = await get_platform_id(session, stock_data.platform)
+    try:
+        row = await InventoryRepository.restock(session, game_id, platform_id, stock_data.quantity)
+    except IntegrityError:
+        # Платформа уже найдена — не сойтись может только внешний ключ на игру
+        raise HTTPException(404, "Игра не найдена!")
+    return StockRead(platform=stock_data.platform, quantity=row.quantity, reserved=row.reserved, available=row.available)
+
+
+async def reserve_service(
+        session: AsyncSession,
+        game_id: int,
+        stock_data: StockChange,
+        user_id: Optional[int] = None,
+) -> ReservationRead:
+    platform_id = await get_platform_id(session, stock_data.platform)
+    row = await InventoryRepository.reserve(session, game_id, platform_id, stock_data.quantity, user_id)
+    if row is None:
+        # Причину отказа выясняем только на редком неуспешном пути
+        if await InventoryRepository.get_stock_item(session, game_id, platform_id) is None:
+            raise HTTPException(404, "Товара нет на складе!")
+        raise HTTPException(409, "Недостаточно товара на складе!")
+    return ReservationRead.model_validate(row)
+
+
+async def explain_close_failure(session: AsyncSession, reservation_id: int, user_id: Optional[int] = None) -> NoReturn:
+    reservation = await InventoryRepository.get_reservation(session, reservation_id)
+    if reservation is None:
+        raise HTTPException(404, "Резерв не найден!")
+    if user_id is not None and reservation.user_id != user_id:
+        raise HTTPException(403, "Доступ запрещен!")
+    raise HTTPException(409, "Резерв уже снят или выдан!")
+
+
+async def release_reservation_service(
+        session: AsyncSession,
+        reservation_id: int,
+        user_id: Optional[int] = None,
+) -> ReservationRead:
+    """Снимает резерв; с user_id — только собственный резерв пользователя (None — администратор)."""
+    row = await InventoryRepository.release(session, reservation_id, user_id)
+    if row is None:
+        await explain_close_failure(session, reservation_id, user_id)
+    return ReservationRead.model_validate(row)
+
+
+async def fulfil_reservation_service(session: AsyncSession, reservation_id: int) -> ReservationRead:
+    row = await InventoryRepository.fulfil(session, reservation_id)
+    if row is None:
+        await explain_close_failure(session, reservation_id)
+    return ReservationRead.model_validate(row)
+
+
+async def pick_reservations_service(session: AsyncSession, limit: int = 20) -> List[ReservationRead]:
+    limit = max(1, min(limit, MAX_PICK_BATCH))
+    rows = await InventoryRepository.pick_reservations(session, limit)
+    return [ReservationRead.model_validate(row) for row in rows]
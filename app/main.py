@@ -1,28 +1,130 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from starlette.middleware.sessions import SessionMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.users.routes import router as user_router
 from app.auth.routes import router as login_router
+from app.games.routes import router as game_router
+from app.analytics.routes import router as analytics_router
+from app.inventory.routes import router as inventory_router
+from app.analytics.refresher import refresh_periodically
 from app.dependencies.templates import templates
+from app.core.page_cache import page_cache
+from app.core.invalidation import invalidation_bus
+from app.core.assets import PrecompressedStaticFiles, build_assets, load_manifest, install_asset_urls
 from app.core.middleware import AuthMiddleware
-from app.core.database import settings
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.container import container
+from app.core.database import async_session, engine, read_engine, warm_pool
+from app.core.templating import precompile_templates
+from app.core.profiling import ProfilingMiddleware, install_sql_instrumentation, router as metrics_router
+from app.users.cache import user_cache
+from app.users.avatars import CONTENT_ADDRESSED_AVATAR
+from app.games.platforms import platform_registry
+from app.games.catalog import catalog, refresh_periodically as refresh_catalog_periodically
+from sqlalchemy.exc import SQLAlchemyError
+import asyncio
+import logging
+import time
 import uvicorn
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        manifest = build_assets()
+    except OSError as exc:
+        # Только для чтения (например, в контейнере) — используем собранный заранее манифест
+        logger.warning("Static asset build failed: %s", exc)
+        manifest = load_manifest()
+    install_asset_urls(templates.resolve(), manifest)
+    count, elapsed = precompile_templates(templates.resolve())
+    logger.info("Precompiled %d templates in %.1f ms", count, elapsed * 1000)
+
+    if settings.PROFILING_ENABLED:
+        install_sql_instrumentation(engine.resolve(), read_engine.resolve())
+
+    try:
+        started = time.perf_counter()
+        for pool_engine in {engine.resolve(), read_engine.resolve()}:
+            await warm_pool(pool_engine, min(settings.DB_POOL_WARM, settings.DB_POOL_SIZE))
+        logger.info("Database pool warmed up in %.1f ms", (time.perf_counter() - started) * 1000)
+    except (SQLAlchemyError, OSError) as exc:
+        logger.warning("Database pool warm-up failed: %s", exc)
+
+    try:
+        async with async_session() as session:
+            await platform_registry.warm(session)
+    except (SQLAlchemyError, OSError) as exc:
+        # Без прогрева реестр заполнится лениво при первой записи игры
+        logger.warning("Platform registry warm-up failed: %s", exc)
+
+    refreshers = []
+    if settings.CATALOG_ENABLED:
+        try:
+            started = time.perf_counter()
+            await catalog.load()
+            logger.info("Game catalog loaded: %d games in %.1f ms", catalog.size, (time.perf_counter() - started) * 1000)
+        except (SQLAlchemyError, OSError) as exc:
+            # Пока снимка нет, листинг идёт в базу; фоновое обновление попробует загрузить его снова
+            logger.warning("Game catalog load failed: %s", exc)
+        refreshers.append(asyncio.create_task(refresh_catalog_periodically(settings.CATALOG_REFRESH_INTERVAL)))
+    if settings.ANALYTICS_REFRESH_INTERVAL > 0:
+        refreshers.append(asyncio.create_task(refresh_periodically(settings.ANALYTICS_REFRESH_INTERVAL)))
+    if invalidation_bus.shared:
+        # Инвалидации кэшей от других воркеров
+        refreshers.append(asyncio.create_task(invalidation_bus.listen()))
+    try:
+        yield
+    finally:
+        for refresher in refreshers:
+            refresher.cancel()
+            # Дожидаемся отмены, чтобы обновление не писало в уже закрытый пул
+            with suppress(asyncio.CancelledError):
+                await refresher
+        # Пулы соединений, кэши и пулы потоков закрываются вместе с приложением
+        await container.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 SESSION_SECRET_KEY = settings.SESSION_SECRET_KEY
 
 app.add_middleware(SessionMiddleware, secret_key="SESSION_SECRET_KEY")
 app.add_middleware(AuthMiddleware)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+if settings.PROFILING_ENABLED:
+    # Последний добавленный middleware — внешний, поэтому в замер попадает и аутентификация
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(metrics_router)
+app.mount(
+    "/static",
+    PrecompressedStaticFiles(directory="app/static", immutable_patterns=[CONTENT_ADDRESSED_AVATAR]),
+    name="static"
+)
 app.include_router(user_router)
 app.include_router(login_router)
+app.include_router(game_router)
+app.include_router(analytics_router)
+app.include_router(inventory_router)
 
 
 @app.get("/", response_class=HTMLResponse)
 async def get_home(request: Request):
-    return templates.TemplateResponse("main.html", {"request": request})
+    if cached := await page_cache.lookup(request):
+        return cached
+    return await page_cache.store(request, await templates.TemplateResponse("main.html", {"request": request}))
+
+
+@app.get("/metrics/cache")
+async def cache_metrics(request: Request):
+    if not request.state.user.is_superuser:
+        raise HTTPException(403, "Доступ запрещен!")
+    return {"user_cache": user_cache.stats()}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="localhost", port=8000, log_level="info")
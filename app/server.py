@@ -0,0 +1,137 @@
+"""Продакшен-запуск: python -m app.server [--workers N] [--host H] [--port P]
+
+Несколько процессов uvicorn на общем сокете, uvloop и httptools, если установлены.
+Каждый воркер принимает трафик только после lifespan: ассеты собраны, шаблоны
+скомпилированы, пул соединений открыт. Сигналы родительскому процессу:
+    SIGHUP   — поочерёдный перезапуск воркеров (после деплоя кода или смены .env);
+               старый воркер гасится, когда новый прошёл lifespan и слушает сокет
+    SIGTTIN  — добавить воркер, SIGTTOU — убрать воркер
+    SIGTERM/SIGINT — мягкая остановка с ожиданием текущих запросов
+"""
+import argparse
+import importlib.util
+import logging
+import multiprocessing
+import os
+import time
+from functools import partial
+from socket import socket
+from typing import List, Optional
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+from uvicorn.supervisors.multiprocess import Process
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+APP = "app.main:app"
+# Воркеры uvicorn запускаются через spawn — событие готовности должно быть из того же контекста
+spawn = multiprocessing.get_context("spawn")
+
+
+class WorkerServer(uvicorn.Server):
+    """Сообщает родителю о готовности, когда lifespan отработал и сокет уже слушается."""
+
+    def __init__(self, config: uvicorn.Config, ready=None):
+        super().__init__(config)
+        self.ready = ready
+
+    async def startup(self, sockets: Optional[List[socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        # При сбое lifespan uvicorn выставляет should_exit — такой воркер не готов
+        if self.ready is not None and not self.should_exit:
+            self.ready.set()
+
+
+def serve(config: uvicorn.Config, sockets: Optional[List[socket]] = None, *, ready=None) -> None:
+    # Супервизор uvicorn передаёт sockets позиционно, поэтому ready — только по имени
+    WorkerServer(config, ready).run(sockets=sockets)
+
+
+class RollingMultiprocess(Multiprocess):
+    """SIGHUP поднимает новый воркер и гасит старый, только когда новый готов принимать трафик."""
+
+    def wait_ready(self, process: Process, ready, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if ready.wait(0.5):
+                return True
+            if not process.process.is_alive():
+                return False
+        return False
+
+    def restart_all(self) -> None:
+        for idx, process in enumerate(self.processes):
+            ready = spawn.Event()
+            new_process = Process(self.config, partial(serve, self.config, ready=ready), self.sockets)
+            new_process.start()
+            if not self.wait_ready(new_process, ready, settings.SERVER_READY_TIMEOUT):
+                # Ждать дальше нельзя: сигналы родителю не обрабатываются, пока идёт перезапуск;
+                # упавший воркер поднимет keep_subprocess_alive
+                logger.warning("Worker [%s] did not become ready, replacing [%s] anyway", new_process.pid, process.pid)
+            process.terminate()
+            process.join()
+            self.processes[idx] = new_process
+
+
+def default_workers() -> int:
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS
+    # Пока сессии и инвалидация кэшей не вынесены в Redis, безопасен только один воркер
+    if settings.multi_worker_problems():
+        return 1
+    return os.cpu_count() or 1
+
+
+def select_implementations() -> dict:
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return {"loop": loop, "http": http}
+
+
+def preload() -> None:
+    # Воркеры запускаются через spawn и импортируют приложение сами; импорт в родителе
+    # нужен, чтобы ошибка в коде или .env остановила запуск до старта N процессов
+    importlib.import_module(APP.partition(":")[0])
+
+
+def check_shared_state(workers: int) -> None:
+    problems = settings.multi_worker_problems() if workers > 1 else []
+    if problems:
+        raise SystemExit(
+            f"Refusing to start {workers} workers with process-local state:\n  " + "\n  ".join(problems)
+        )
+
+
+def main(host: str, port: int, workers: int, graceful_timeout: int) -> None:
+    check_shared_state(workers)
+    preload()
+    implementations = select_implementations()
+    config = uvicorn.Config(
+        APP,
+        host=host,
+        port=port,
+        workers=workers,
+        proxy_headers=True,
+        timeout_graceful_shutdown=graceful_timeout,
+        **implementations,
+    )
+    logger.info("Starting %d worker(s): loop=%s, http=%s", workers, implementations["loop"], implementations["http"])
+
+    if workers == 1:
+        serve(config)
+        return
+    sock = config.bind_socket()
+    RollingMultiprocess(config, target=partial(serve, config), sockets=[sock]).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Продакшен-запуск приложения")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT)
+    args = parser.parse_args()
+    main(args.host, args.port, args.workers, args.graceful_timeout)
@@ -0,0 +1,43 @@
+// Данные дашборда приходят из /analytics/dashboard (материализованные представления)
+(function () {
+  var purple = '#6C5DD3';
+  var blue = '#A0D7E7';
+  var green = '#7FBA7A';
+
+  function render(selector, options) {
+    var chart = document.querySelector(selector);
+    if (chart) {
+      new ApexCharts(chart, options).render();
+    }
+  }
+
+  function baseOptions(type, color) {
+    return {
+      colors: [color],
+      chart: {height: '100%', type: type, toolbar: {show: false}},
+      dataLabels: {enabled: false},
+      legend: {show: false},
+      grid: {borderColor: '#E4E4E4'}
+    };
+  }
+
+  fetch('/analytics/dashboard', {credentials: 'same-origin'})
+    .then(function (response) { return response.json(); })
+    .then(function (data) {
+      render('#chart-games-per-platform', Object.assign(baseOptions('bar', purple), {
+        series: [{name: 'Игры', data: data.games_per_platform.map(function (row) { return row.games; })}],
+        xaxis: {categories: data.games_per_platform.map(function (row) { return row.platform; })}
+      }));
+
+      render('#chart-catalog-growth', Object.assign(baseOptions('area', blue), {
+        series: [{name: 'Всего игр', data: data.catalog_growth.map(function (row) { return [row.month, row.total]; })}],
+        xaxis: {type: 'datetime'},
+        stroke: {width: 2, curve: 'smooth'}
+      }));
+
+      render('#chart-user-signups', Object.assign(baseOptions('bar', green), {
+        series: [{name: 'Регистрации', data: data.user_signups.map(function (row) { return [row.day, row.users]; })}],
+        xaxis: {type: 'datetime'}
+      }));
+    });
+})();
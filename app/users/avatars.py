@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.container import container
+from app.core.database import after_commit, after_rollback, async_session
+from app.users.repository import UserRepository
+
+AVATAR_DIR = "app/static/avatars"
+AVATAR_URL_PREFIX = "/static/avatars/"
+# До коммита аватар лежит здесь, а не в AVATAR_DIR: откат не оставит файлов-сирот
+AVATAR_STAGING_DIR = os.path.join(tempfile.gettempdir(), "avatar-staging")
+AVATAR_SIZE = (256, 256)
+AVATAR_QUALITY = 85
+CHUNK_SIZE = 64 * 1024
+MAX_FILE_SIZE = 5 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+# Имя файла — хэш содержимого, поэтому такие аватары можно кэшировать навсегда
+CONTENT_ADDRESSED_AVATAR = re.compile(r"^avatars/[0-9a-f]{32}\.webp$")
+
+ALLOWED_MIME_TYPES = {
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+}
+
+# Пул процессов поднимается при первой загрузке аватара и гасится в lifespan
+thumbnail_pool = container.register(
+    "thumbnail_pool",
+    lambda: ProcessPoolExecutor(max_workers=settings.AVATAR_WORKERS),
+    close=lambda pool: pool.shutdown(wait=False, cancel_futures=True),
+)
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Определяет тип изображения по сигнатуре, а не по заголовку от клиента."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"BM"):
+        return "image/bmp"
+    return None
+
+
+def make_thumbnail(source_path: str, staging_dir: str) -> Tuple[str, str]:
+    """Выполняется в отдельном процессе: ресайз в WebP; возвращает имя-хэш и путь к подготовленному файлу."""
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image = ImageOps.fit(image.convert("RGBA"), AVATAR_SIZE, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=AVATAR_QUALITY, method=6)
+
+    data = buffer.getvalue()
+    file_name = hashlib.sha256(data).hexdigest()[:32] + ".webp"
+    fd, staged_path = tempfile.mkstemp(suffix=".webp", dir=staging_dir)
+    with os.fdopen(fd, "wb") as file:
+        file.write(data)
+    return file_name, staged_path
+
+
+def publish_staged(staged_path: str, file_name: str) -> None:
+    os.makedirs(AVATAR_DIR, exist_ok=True)
+    target = os.path.join(AVATAR_DIR, file_name)
+    # Переносим рядом с целью и подменяем атомарно; существующий файл с тем же хэшем
+    # перезаписываем — его могли удалить, пока шла наша транзакция
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    shutil.move(staged_path, tmp_path)
+    os.replace(tmp_path, target)
+
+
+async def _stream_to_temp_file(upload: UploadFile) -> str:
+    # Временный файл вне app/static, чтобы необработанная загрузка не была доступна по URL
+    fd, tmp_path = tempfile.mkstemp(suffix=".upload")
+    os.close(fd)
+    size = 0
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as file:
+            while chunk := await upload.read(CHUNK_SIZE):
+                if size == 0 and sniff_image_type(chunk[:16]) not in ALLOWED_MIME_TYPES:
+                    raise HTTPException(400, "Можно загружать только изображения (jpeg, png, gif, webp, bmp)!")
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(400, "Максимальный размер файла — 5 МБ!")
+                await file.write(chunk)
+        if size == 0:
+            raise HTTPException(400, "Файл пустой!")
+    except BaseException:
+        await anyio.Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+async def save_avatar(session: AsyncSession, upload: UploadFile) -> str:
+    """Готовит аватар и возвращает его URL вида /static/avatars/<hash>.webp.
+
+    Файл появляется в AVATAR_DIR только после коммита сессии, при откате — удаляется.
+    """
+    # Pillow нужен только здесь и в дочернем процессе — не тянем его при импорте приложения
+    from PIL import Image
+
+    tmp_path = await _stream_to_temp_file(upload)
+    os.makedirs(AVATAR_STAGING_DIR, exist_ok=True)
+    try:
+        file_name, staged_path = await asyncio.get_running_loop().run_in_executor(
+            thumbnail_pool.resolve(), make_thumbnail, tmp_path, AVATAR_STAGING_DIR
+        )
+    except (OSError, Image.DecompressionBombError, SyntaxError, ValueError):
+        raise HTTPException(400, "Не удалось обработать изображение!")
+    finally:
+        await anyio.Path(tmp_path).unlink(missing_ok=True)
+
+    async def publish():
+        await anyio.to_thread.run_sync(publish_staged, staged_path, file_name)
+
+    async def discard():
+        await anyio.Path(staged_path).unlink(missing_ok=True)
+
+    after_commit(session, publish)
+    after_rollback(session, discard)
+    return AVATAR_URL_PREFIX + file_name
+
+
+async def delete_unused_avatar(avatar: Optional[str]) -> None:
+    """Вызывается после коммита. Одинаковые картинки разных пользователей — один файл,
+    поэтому удаляем его, только если в закоммиченных данных на него никто не ссылается."""
+    if not avatar or not avatar.startswith(AVATAR_URL_PREFIX):
+        return
+    async with async_session() as session:
+        if await UserRepository.avatar_in_use(session, avatar):
+            return
+    file_name = os.path.basename(avatar)
+    await anyio.Path(AVATAR_DIR, file_name).unlink(missing_ok=True)
@@ -0,0 +1,30 @@
+from typing import Optional, Sequence
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.container import container
+from app.core.invalidation import invalidation_bus, on_invalidate
+from app.users.models import User
+
+# Кэш проверенных пользователей для AuthMiddleware: ключ — (username, iat токена)
+user_cache = container.register(
+    "user_cache", lambda: TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+)
+
+
+def get_cached_user(username: str, token_version: Optional[int]) -> Optional[User]:
+    return user_cache.get((username, token_version))
+
+
+def cache_user(username: str, token_version: Optional[int], user: User) -> None:
+    user_cache.set((username, token_version), user)
+
+
+@on_invalidate("user")
+def drop_users(usernames: Sequence[str]) -> None:
+    usernames = set(usernames)
+    user_cache.delete_where(lambda key, _: key[0] in usernames)
+
+
+async def invalidate_users(*usernames: str) -> None:
+    # Кэш свой у каждого воркера — сбрасываем его везде, а не только в этом процессе
+    await invalidation_bus.publish("user", *usernames)
@@ -1,15 +1,15 @@
-from sqlalchemy import select
+from sqlalchemy import select, exists, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.users.models import User
-from typing import Optional
+from typing import Iterable, Optional, Set
 
 
 class UserRepository:
     @staticmethod
     async def create_user(session: AsyncSession, user: User) -> User:
         session.add(user)
-        await session.commit()
-        await session.refresh(user)
+        await session.flush()
         return user
 
     @staticmethod
@@ -27,16 +27,60 @@ class UserRepository:
         result = await session.execute(select(User).where(User.username == username))
         return result.scalars().first()
 
+    @staticmethod
+    async def exists_by(session: AsyncSession, **fields) -> bool:
+        condition = and_(*(getattr(User, name) == value for name, value in fields.items()))
+        result = await session.execute(select(exists().where(condition)))
+        return result.scalar()
+
+    @staticmethod
+    async def taken_fields(session: AsyncSession, **fields) -> Set[str]:
+        # Один запрос вместо отдельной проверки на каждое уникальное поле
+        matches = [(name, getattr(User, name) == value) for name, value in fields.items()]
+        result = await session.execute(
+            select(*(func.bool_or(condition).label(name) for name, condition in matches))
+            .where(or_(*(condition for _, condition in matches)))
+        )
+        row = result.mappings().one()
+        return {name for name, taken in row.items() if taken}
+
+    @staticmethod
+    async def insert_if_absent(session: AsyncSession, values: dict) -> Optional[User]:
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING: None, если строка уже есть
+        result = await session.execute(
+            insert(User).values(**values).on_conflict_do_nothing().returning(User)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def upsert(
+            session: AsyncSession,
+            values: dict,
+            conflict_field: str,
+            update_fields: Iterable[str],
+    ) -> User:
+        stmt = insert(User).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(User, conflict_field)],
+            set_={name: stmt.excluded[name] for name in update_fields},
+        ).returning(User)
+        result = await session.execute(stmt, execution_options={"populate_existing": True})
+        return result.scalars().one()
+
+    @staticmethod
+    async def avatar_in_use(session: AsyncSession, avatar: str) -> bool:
+        result = await session.execute(select(exists().where(User.avatar == avatar)))
+        return result.scalar()
+
     @staticmethod
     async def update_user(session: AsyncSession, user: User) -> User:
-        await session.commit()
-        await session.refresh(user)
+        await session.flush()
         return user
 
     @staticmethod
     async def delete_user(session: AsyncSession, user: User) -> None:
         await session.delete(user)
-        await session.commit()
+        await session.flush()
 
     @staticmethod
     async def get_all_users(session: AsyncSession):
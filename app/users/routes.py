@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Request, Form, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Request, Form, Depends, HTTPException, File, UploadFile, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.templates import templates
-from app.core.database import get_session
+from app.core.page_cache import page_cache, profile_tag
+from app.core.database import after_commit, get_session
 from app.users.schemas import UserCreate, UserUpdate
-from app.users.service import create_user_service, update_user_service
+from app.users.service import create_user_service, update_user_service, delete_user_service
+from app.auth.sessions import session_store
 from app.users.repository import UserRepository
 from datetime import date
 from typing import Optional
@@ -16,7 +18,9 @@ router = APIRouter()
 async def register_page(request: Request):
     if request.state.user:
         return RedirectResponse("/", status_code=303)
-    return templates.TemplateResponse("users/register.html", {"request": request})
+    if cached := await page_cache.lookup(request):
+        return cached
+    return await page_cache.store(request, await templates.TemplateResponse("users/register.html", {"request": request}))
 
 
 @router.post("/register", response_class=HTMLResponse)
@@ -32,11 +36,13 @@ async def register_user(
 
     try:
         await create_user_service(session, user_data)
-        return templates.TemplateResponse(
+        return await templates.TemplateResponse(
             "users/register_success.html", {"request": request}
         )
     except HTTPException as exc:
-        return templates.TemplateResponse(
+        if exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+            raise
+        return await templates.TemplateResponse(
             "users/register.html",
             {
                 "request": request,
@@ -50,20 +56,26 @@ async def register_user(
 async def get_profile(
         request: Request,
         username: str,
+        # Страница кэшируется на PAGE_CACHE_TTL: читаем с primary, иначе отстающая реплика
+        # снова положит в кэш профиль, который только что инвалидировали
         session: AsyncSession = Depends(get_session),
 ):
+    if cached := await page_cache.lookup(request):
+        return cached
+
     user = await UserRepository.get_user_by_username(session, username)
 
     if not user:
         raise HTTPException(404, "Пользователь не найден!")
 
-    return templates.TemplateResponse(
+    response = await templates.TemplateResponse(
         "users/profile.html",
         {
             "request": request,
             "user": user,
         }
     )
+    return await page_cache.store(request, response, tags=[profile_tag(username)])
 
 
 @router.get("/user/{username}/edit", response_class=HTMLResponse)
@@ -79,12 +91,15 @@ async def edit_profile_page(
     if user.id != request.state.user.id:
         raise HTTPException(403, "Доступ запрещен!")
 
-    return templates.TemplateResponse(
+    # Страница не кэшируется — отдаём её потоком, не дожидаясь рендеринга целиком.
+    # Рендер идёт уже после закрытия сессии: шаблон читает только колонки User, без связей
+    return await templates.TemplateResponse(
         "users/edit_profile.html",
         {
             "request": request,
             "user": user,
-        }
+        },
+        stream=True,
     )
 
 
@@ -112,7 +127,9 @@ async def edit_profile(
         await update_user_service(session, user_id=user.id, user_data=user_data, current_user_id=request.state.user.id)
         return RedirectResponse(f"/user/{username}", status_code=303)
     except HTTPException as exc:
-        return templates.TemplateResponse(
+        if exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+            raise
+        return await templates.TemplateResponse(
             "users/edit_profile.html",
             {
                 "request": request,
@@ -124,3 +141,29 @@ async def edit_profile(
                 }
             }
         )
+
+
+@router.post("/user/{username}/delete")
+async def delete_profile(
+        request: Request,
+        username: str,
+        session: AsyncSession = Depends(get_session),
+):
+    user = await UserRepository.get_user_by_username(session, username)
+
+    if not user:
+        raise HTTPException(404, "Пользователь не найден!")
+
+    current_user = request.state.user
+    await delete_user_service(
+        session, user_id=user.id, current_user_id=current_user.id, is_superuser=current_user.is_superuser
+    )
+
+    response = RedirectResponse("/", status_code=303)
+    if user.id == current_user.id:
+        # Свой аккаунт удалён — завершаем и сессию, но только если удаление закоммитилось
+        sid = (request.scope.get("auth") or {}).get("sid")
+        after_commit(session, lambda: session_store.revoke(sid))
+        response.delete_cookie("access_token")
+        response.delete_cookie("refresh_token")
+    return response
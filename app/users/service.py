@@ -1,39 +1,46 @@
-from urllib.request import Request
-
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.users.models import User
 from app.users.schemas import UserCreate, UserUpdate
 from app.users.repository import UserRepository
-from app.auth.security import get_password_hash
-import os
-
-MAX_FILE_SIZE = 5 * 1024 * 1024
-ALLOWED_MIME_TYPES = {
-    "image/jpeg",
-    "image/png",
-    "image/gif",
-    "image/webp",
-    "image/bmp",
+from app.users.cache import invalidate_users
+from app.core.page_cache import page_cache, profile_tag, user_viewer_tag
+from app.users.avatars import save_avatar, delete_unused_avatar
+from app.auth.security import get_password_hash_async
+from app.core.database import after_commit
+
+CONFLICT_MESSAGES = {
+    "email": "Email уже зарегистрирован",
+    "username": "Имя пользователя уже занято",
 }
 
 
+def raise_conflict(taken: set) -> None:
+    for field, message in CONFLICT_MESSAGES.items():
+        if field in taken:
+            raise HTTPException(409, message)
+
+
 async def create_user_service(session: AsyncSession, user_data: UserCreate) -> User:
-    if await UserRepository.get_user_by_email(session, str(user_data.email)):
-        raise HTTPException(409, "Email уже зарегистрирован")
-    if await UserRepository.get_user_by_username(session, user_data.username):
-        raise HTTPException(409, "Имя пользователя уже занято")
     if len(user_data.password) < 8:
         raise HTTPException(400, "Пароль должен содержать не менее 8 символов")
 
-    user = User(
-        email=str(user_data.email),
-        hashed_password=get_password_hash(user_data.password),
-        username=user_data.username,
-        full_name=user_data.full_name
-    )
+    unique_values = {"email": str(user_data.email), "username": user_data.username}
+    # Дешёвая проверка до bcrypt: дубликаты не тратят время на хэширование
+    raise_conflict(await UserRepository.taken_fields(session, **unique_values))
+
+    user = await UserRepository.insert_if_absent(session, {
+        **unique_values,
+        "hashed_password": await get_password_hash_async(user_data.password),
+        "full_name": user_data.full_name,
+    })
+    if user is None:
+        # Параллельная регистрация успела раньше. ON CONFLICT DO NOTHING не прерывает
+        # транзакцию, а в READ COMMITTED следующий запрос уже видит чужую строку
+        raise_conflict(await UserRepository.taken_fields(session, **unique_values))
+        raise HTTPException(409, "Пользователь уже существует")
 
-    return await UserRepository.create_user(session, user)
+    return user
 
 
 async def update_user_service(
@@ -49,34 +56,58 @@ async def update_user_service(
     if user_id != current_user_id:
         raise HTTPException(403, "Доступ запрещен!")
 
+    old_username = user.username
     update_data = user_data.model_dump(exclude_unset=True)
 
     if "password" in update_data and update_data["password"]:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
 
     avatar_file = getattr(user_data, "avatar", None)
 
+    old_avatar = user.avatar
     if avatar_file and avatar_file.filename:
-        if avatar_file.content_type not in ALLOWED_MIME_TYPES:
-            raise HTTPException(400, "Можно загружать только изображения (jpeg, png, gif, webp, bmp)!")
-        contents = await avatar_file.read()
-        if len(contents) > MAX_FILE_SIZE:
-            raise HTTPException(400, "Максимальный размер файла — 5 МБ!")
-
-        upload_dir = "app/static/avatars"
-        os.makedirs(upload_dir, exist_ok=True)
-        ext = os.path.splitext(avatar_file.filename)[-1]
-        file_name = f"{user.username}{ext}"
-        file_location = os.path.join(upload_dir, file_name)
-        with open(file_location, "wb") as buffer:
-            buffer.write(contents)
-        user.avatar = f"/static/avatars/{file_name}"
+        user.avatar = await save_avatar(session, avatar_file)
 
     update_data.pop("avatar", None)
 
     for field, value in update_data.items():
         setattr(user, field, value)
 
-    await session.commit()
-    await session.refresh(user)
+    await UserRepository.update_user(session, user)
+
+    new_username, updated_id, new_avatar = user.username, user.id, user.avatar
+
+    async def on_commit():
+        if old_avatar != new_avatar:
+            await delete_unused_avatar(old_avatar)
+        await invalidate_users(old_username, new_username)
+        # Профиль и все страницы, где в шапке аватар этого пользователя
+        await page_cache.invalidate(profile_tag(old_username), profile_tag(new_username), user_viewer_tag(updated_id))
+
+    after_commit(session, on_commit)
     return user
+
+
+async def delete_user_service(
+        session: AsyncSession,
+        user_id: int,
+        current_user_id: int,
+        is_superuser: bool = False
+) -> None:
+    user = await UserRepository.get_user_by_id(session, user_id)
+
+    if not user:
+        raise HTTPException(404, "Пользователь не найден")
+    # Удалить аккаунт может сам владелец или администратор
+    if user_id != current_user_id and not is_superuser:
+        raise HTTPException(403, "Доступ запрещен!")
+
+    username, deleted_id, avatar = user.username, user.id, user.avatar
+    await UserRepository.delete_user(session, user)
+
+    async def on_commit():
+        await delete_unused_avatar(avatar)
+        await invalidate_users(username)
+        await page_cache.invalidate(profile_tag(username), user_viewer_tag(deleted_id))
+
+    after_commit(session, on_commit)
@@ -0,0 +1,100 @@
+"""Сравнение requests/sec: AuthMiddleware на BaseHTTPMiddleware против чистого ASGI.
+
+Запуск: python -m benchmarks.auth_middleware [--requests 5000]
+
+Пользователь кладётся в user_cache заранее, поэтому база данных не нужна —
+измеряются только накладные расходы middleware.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.auth.security import create_access_token, decode_access_token
+from app.core.middleware import AuthMiddleware
+from app.dependencies.templates import templates
+from app.users.cache import cache_user
+from app.users.models import User
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """Прежняя реализация: та же проверка токенов, но через BaseHTTPMiddleware."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.auth = AuthMiddleware(app)
+
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+        if path.startswith("/static/css/") or path.startswith("/static/js/"):
+            user = None
+        else:
+            user, _, _, _ = await self.auth.authenticate(request.cookies)
+        request.state.user = user
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+    app.mount("/static", StaticFiles(directory="app/static"), name="static")
+
+    @app.get("/", response_class=HTMLResponse)
+    async def get_home(request: Request):
+        return await templates.TemplateResponse("main.html", {"request": request})
+
+    return app
+
+
+async def call(app, path: str, cookie: bytes) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234), "headers": [(b"host", b"testserver"), (b"cookie", cookie)],
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, path: str, cookie: bytes, requests: int) -> float:
+    assert await call(app, path, cookie) == 200, path
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path, cookie)
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int) -> None:
+    username = "benchuser"
+    token = create_access_token({"sub": username})
+    user = User(id=1, username=username, email="bench@example.com", avatar=None, is_superuser=False)
+    cache_user(username, decode_access_token(token)["iat"], user)
+    cookie = f"access_token={token}".encode()
+
+    apps = {"BaseHTTPMiddleware": build_app(LegacyAuthMiddleware), "pure ASGI": build_app(AuthMiddleware)}
+    for path in ("/", "/static/css/auth.css"):
+        for name, app in apps.items():
+            rps = await measure(app, path, cookie, requests)
+            print(f"{path:<24} {name:<20} {rps:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
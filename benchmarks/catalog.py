@@ -0,0 +1,121 @@
+"""Снимок каталога в памяти: занимаемая память и задержка запросов на 100k игр.
+
+Запуск: python -m benchmarks.catalog [--games 100000] [--repeat 2000]
+
+Строки генерируются в формате GameRepository.get_catalog_rows, база данных не нужна.
+Память — прирост по tracemalloc после сборки снимка и удаления исходных строк;
+для сравнения — те же игры как ORM-объекты Game, без платформ.
+Задержки — медиана и p99 на запрос; строка «service» — list_games_service целиком,
+с построением GameListItem, как в GET /games.
+"""
+import argparse
+import asyncio
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app.games.catalog import CatalogIndex, catalog, sort_key
+from app.games.models import Game
+from app.games.service import list_games_service
+
+PLATFORMS = ["PC", "PS4", "PS5", "Xbox One", "Xbox Series X", "Switch", "Steam Deck", "Dreamcast"]
+# Доля игр на платформе: Dreamcast — редкий фильтр
+PLATFORM_WEIGHTS = [0.7, 0.4, 0.5, 0.3, 0.3, 0.35, 0.1, 0.005]
+WORDS = ["Dark", "Legend", "Star", "Quest", "Souls", "Racing", "Empire", "Shadow", "Tales", "Galaxy", "Knight", "Zero"]
+
+
+def make_rows(count: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for game_id in range(1, count + 1):
+        name = " ".join(rnd.sample(WORDS, 3)) + f" {game_id}"
+        platforms = [i + 1 for i, weight in enumerate(PLATFORM_WEIGHTS) if rnd.random() < weight] or [1]
+        rows.append((game_id, name, rnd.randint(1990, 2025), started + timedelta(seconds=game_id), platforms))
+    return rows
+
+
+def orm_games(rows: list) -> list:
+    return [Game(id=game_id, name=name, year=year, updated_at=updated_at) for game_id, name, year, updated_at, _ in rows]
+
+
+def measure_memory(label: str, build, games: int):
+    # Исходные строки создаются внутри build и к замеру уже освобождены
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    footprint = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"  {label:<38} {footprint / 2 ** 20:7.1f} MiB  {footprint / games:5.0f} B/game")
+    return result
+
+
+def timed(func, repeat: int) -> tuple:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.median(samples) * 1_000_000, samples[int(len(samples) * 0.99) - 1] * 1_000_000
+
+
+def report(label: str, func, repeat: int) -> None:
+    p50, p99 = timed(func, repeat)
+    print(f"  {label:<34} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+
+
+def main(games: int, repeat: int) -> None:
+    platforms = {name: i + 1 for i, name in enumerate(PLATFORMS)}
+
+    rows = make_rows(games)
+    started = time.perf_counter()
+    CatalogIndex.build(rows, platforms)
+    print(f"{games} games: build {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    index = measure_memory("catalog snapshot", lambda: CatalogIndex.build(make_rows(games), platforms), games)
+    measure_memory("same games as ORM Game (no platforms)", lambda: orm_games(make_rows(games)), games)
+
+    middle = sort_key(index.ordered[len(index.ordered) // 2])
+    ids = list(index.games)
+    names = [game.name for game in index.ordered]
+    rnd = random.Random(2)
+
+    print("queries (limit 21, как list_games_service при странице 20):")
+    report("first page", lambda: index.list_games(21), repeat)
+    report("page from the middle (cursor)", lambda: index.list_games(21, after=middle), repeat)
+    report("platform=PS5 (~50%)", lambda: index.list_games(21, platform="PS5"), repeat)
+    report("platform=Dreamcast (~0.5%)", lambda: index.list_games(21, platform="Dreamcast"), repeat)
+    report("year 2001..2001 (~3%)", lambda: index.list_games(21, year_from=2001, year_to=2001), repeat)
+    report("Switch + 2010..2015", lambda: index.list_games(21, platform="Switch", year_from=2010, year_to=2015), repeat)
+    report("get by id", lambda: index.get(rnd.choice(ids)), repeat)
+    report("find by name", lambda: index.find_by_name(rnd.choice(names)), repeat)
+
+    changed = [
+        (game_id, f"Renamed {game_id}", 2020, datetime.now(timezone.utc), [1, 3])
+        for game_id in rnd.sample(ids, 100)
+    ]
+    started = time.perf_counter()
+    index.upsert(changed)
+    print(f"  {'incremental upsert, 100 rows':<34} {(time.perf_counter() - started) * 1000:9.2f} ms")
+
+    catalog.resolve().index = index
+
+    async def service_page():
+        await list_games_service(None, limit=20, platform="PS5")
+
+    loop = asyncio.new_event_loop()
+    report("service: GET /games?platform=PS5", lambda: loop.run_until_complete(service_page()), repeat // 4)
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.games, args.repeat)
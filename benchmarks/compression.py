@@ -0,0 +1,78 @@
+"""Цена и выигрыш сжатия по уровням: байты на проводе против CPU на ответ.
+
+Запуск: python -m benchmarks.compression [--repeat 200]
+
+Полезная нагрузка — отрендеренная главная страница и JSON страницы каталога
+на 100 игр. Сжатие идёт теми же потоковыми классами, что и в CompressionMiddleware,
+кусками по 16 КБ, как их отдаёт потоковый TemplateResponse. База данных не нужна.
+"""
+import argparse
+import json
+import time
+
+from app.core.compression import BrotliStream, GzipStream
+from app.core.templating import STREAM_CHUNK_SIZE
+from app.dependencies.templates import templates
+from benchmarks.templates import make_request
+
+GZIP_LEVELS = (1, 4, 6, 9)
+BROTLI_QUALITIES = (0, 2, 4, 5, 7, 9, 11)
+
+
+def html_payload() -> bytes:
+    template = templates.get_template("main.html")
+    context = {"request": make_request()}
+    if template.environment.is_async:
+        import asyncio
+
+        return asyncio.run(template.render_async(context)).encode()
+    return template.render(context).encode()
+
+
+def json_payload() -> bytes:
+    items = [
+        {
+            "id": i,
+            "name": f"Game title number {i}",
+            "year": 2000 + i % 25,
+            "description": "An action adventure game with an open world and online multiplayer.",
+            "platforms": ["PS4", "PS5"] if i % 2 else ["PS5"],
+        }
+        for i in range(100)
+    ]
+    return json.dumps({"items": items, "next_cursor": "eyJuYW1lIjoiR2FtZSJ9"}).encode()
+
+
+def compress(make_stream, payload: bytes) -> bytes:
+    stream = make_stream()
+    out = [stream.compress(payload[i:i + STREAM_CHUNK_SIZE]) for i in range(0, len(payload), STREAM_CHUNK_SIZE)]
+    out.append(stream.finish())
+    return b"".join(out)
+
+
+def measure(name: str, make_stream, payload: bytes, repeat: int) -> None:
+    size = len(compress(make_stream, payload))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        compress(make_stream, payload)
+    per_response = (time.perf_counter() - started) / repeat
+    print(
+        f"  {name:<10} {size:>8} B  {size / len(payload):6.1%}  "
+        f"{per_response * 1_000_000:9.1f} us/resp  {len(payload) / per_response / 1_000_000:8.1f} MB/s"
+    )
+
+
+def main(repeat: int) -> None:
+    for label, payload in (("HTML main.html", html_payload()), ("JSON /games", json_payload())):
+        print(f"{label}: {len(payload)} B uncompressed")
+        for level in GZIP_LEVELS:
+            measure(f"gzip-{level}", lambda: GzipStream(level), payload, repeat)
+        for quality in BROTLI_QUALITIES:
+            measure(f"br-{quality}", lambda: BrotliStream(quality), payload, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,254 @@
+"""Нагрузочный прогон основных страниц приложения in-process, без сетевого сервера.
+
+Запуск (нужна PostgreSQL из .env с применёнными миграциями):
+    python -m benchmarks.endpoints [--requests 500] [--concurrency 20] [--only home,games]
+    python -m benchmarks.endpoints --save-baseline        # записать текущие цифры как эталон
+    python -m benchmarks.endpoints --tolerance 0.15       # сравнить с эталоном
+
+ASGI-приложение вызывается напрямую, поэтому в замер попадают middleware,
+зависимости, запросы к базе и рендеринг шаблонов, но не HTTP-парсер uvicorn.
+Для каждого сценария печатаются p50/p95/p99 и requests/sec. Эталон хранится
+в benchmarks/baselines/endpoints.json; при ухудшении p95 или req/s больше
+допуска скрипт завершается с кодом 1.
+Тестовые пользователи и игры создаются с уникальным префиксом и удаляются в конце.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from itertools import count
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from sqlalchemy import delete
+
+from app.auth.security import create_access_token, get_password_hash_async
+from app.core.database import unit_of_work
+from app.games.models import Game
+from app.games.repository import GameRepository
+from app.main import app as main_app
+from app.users.models import User
+from app.users.repository import UserRepository
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "endpoints.json")
+PASSWORD = "benchmark-pass"
+SEED_GAMES = 200
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+@dataclass
+class Result:
+    requests: int
+    errors: int
+    rps: float
+    p50: float
+    p95: float
+    p99: float
+
+
+async def call(app, method: str, path: str, headers: Headers = (), body: bytes = b"") -> int:
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234), "headers": [(b"host", b"testserver"), *headers],
+    }
+    status = 0
+    body_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Клиент «отключается» только после ответа — как у настоящего сервера
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            finished.set()
+
+    await app(scope, receive, send)
+    finished.set()
+    return status
+
+
+def form(**fields) -> Tuple[Headers, bytes]:
+    return [(b"content-type", b"application/x-www-form-urlencoded")], urlencode(fields).encode()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+        request: Callable[[int], Awaitable[int]],
+        expected: int,
+        requests: int,
+        concurrency: int,
+) -> Result:
+    await request(-1)  # прогрев: кэши, пул соединений, скомпилированные шаблоны
+    latencies: List[float] = []
+    errors = 0
+    counter = count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            started = time.perf_counter()
+            status = await request(i)
+            latencies.append(time.perf_counter() - started)
+            if status != expected:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return Result(
+        requests=requests,
+        errors=errors,
+        rps=round(requests / elapsed, 1),
+        p50=round(percentile(latencies, 50) * 1000, 2),
+        p95=round(percentile(latencies, 95) * 1000, 2),
+        p99=round(percentile(latencies, 99) * 1000, 2),
+    )
+
+
+async def seed(prefix: str) -> str:
+    async with unit_of_work() as session:
+        await UserRepository.create_user(session, User(
+            email=f"{prefix}@example.com",
+            username=prefix,
+            hashed_password=await get_password_hash_async(PASSWORD),
+        ))
+        await GameRepository.upsert_games(session, [
+            {"name": f"{prefix} game {i}", "year": 2000 + i % 25, "description": "benchmark"}
+            for i in range(SEED_GAMES)
+        ])
+    return prefix
+
+
+async def cleanup(prefix: str) -> None:
+    async with unit_of_work() as session:
+        await session.execute(delete(Game).where(Game.name.startswith(prefix)))
+        await session.execute(delete(User).where(User.username.startswith(prefix)))
+
+
+def build_scenarios(app, username: str, prefix: str) -> Dict[str, Tuple[Callable[[int], Awaitable[int]], int]]:
+    cookie = [(b"cookie", f"access_token={create_access_token({'sub': username})}".encode())]
+    login_headers, login_body = form(username=username, password=PASSWORD)
+
+    async def login(i):
+        return await call(app, "POST", "/login", login_headers, login_body)
+
+    async def home(i):
+        return await call(app, "GET", "/", cookie)
+
+    async def profile(i):
+        return await call(app, "GET", f"/user/{username}", cookie)
+
+    async def register(i):
+        name = f"{prefix}_r{i}".replace("-", "_")
+        headers, body = form(email=f"{name}@example.com", username=name, password=PASSWORD)
+        return await call(app, "POST", "/register", headers, body)
+
+    async def games(i):
+        return await call(app, "GET", "/games?limit=20", cookie)
+
+    return {
+        "login": (login, 303),
+        "home": (home, 200),
+        "profile": (profile, 200),
+        "register": (register, 200),
+        "games": (games, 200),
+    }
+
+
+def load_baseline() -> Dict[str, dict]:
+    try:
+        with open(BASELINE_PATH, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(results: Dict[str, Result]) -> None:
+    os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+    baseline = {**load_baseline(), **{name: asdict(result) for name, result in results.items()}}
+    with open(BASELINE_PATH, "w", encoding="utf-8") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+
+
+def regressions(results: Dict[str, Result], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    found = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if result.p95 > reference["p95"] * (1 + tolerance):
+            found.append(f"{name}: p95 {result.p95} ms vs baseline {reference['p95']} ms")
+        if result.rps < reference["rps"] * (1 - tolerance):
+            found.append(f"{name}: {result.rps} req/s vs baseline {reference['rps']} req/s")
+    return found
+
+
+async def main(
+        requests: int,
+        concurrency: int,
+        only: Optional[List[str]],
+        save: bool,
+        tolerance: float,
+) -> int:
+    prefix = f"bench_{uuid.uuid4().hex[:8]}"
+    results: Dict[str, Result] = {}
+    async with main_app.router.lifespan_context(main_app):
+        try:
+            username = await seed(prefix)
+            scenarios = build_scenarios(main_app, username, prefix)
+            for name, (request, expected) in scenarios.items():
+                if only and name not in only:
+                    continue
+                results[name] = await run_scenario(request, expected, requests, concurrency)
+        finally:
+            await cleanup(prefix)
+
+    baseline = load_baseline()
+    print(f"{'scenario':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}  baseline p95")
+    for name, r in results.items():
+        reference = baseline.get(name, {}).get("p95", "-")
+        print(f"{name:<10} {r.rps:>9} {r.p50:>9} {r.p95:>9} {r.p99:>9} {r.errors:>7}  {reference}")
+
+    if save:
+        save_baseline(results)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    found = regressions(results, baseline, tolerance)
+    for line in found:
+        print(f"  !! regression {line}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--only", type=lambda value: value.split(","), default=None)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.requests, args.concurrency, args.only, args.save_baseline, args.tolerance)))
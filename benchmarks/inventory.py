@@ -0,0 +1,170 @@
+"""Резервы на одной «горячей» позиции: пропускная способность и отсутствие перепродажи.
+
+Запуск (нужна база из .env с применёнными миграциями):
+    python -m benchmarks.inventory [--attempts 2000] [--stock 1500] [--concurrency 50] [--pickers 4] [--naive]
+
+attempts кассиров одновременно резервируют по штуке одной позиции с остатком stock:
+ровно stock попыток должно пройти, остальные — получить 409. Затем pickers сборщиков
+параллельно выдают резервы пачками (FOR UPDATE SKIP LOCKED): каждый резерв — ровно
+одному сборщику, остаток уменьшается на число выданных. С --naive тот же поток
+резервов гоняется через «прочитать остаток — проверить — записать» для сравнения:
+там видны потерянные обновления. Созданные игра и платформа удаляются в конце.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+
+from app.core.container import container
+from app.core.database import unit_of_work
+from app.games.models import Game, Platform
+from app.inventory.models import StockItem
+from app.inventory.repository import InventoryRepository
+from app.inventory.schemas import StockChange
+from app.inventory.service import reserve_service, pick_reservations_service
+
+
+async def seed(prefix: str, stock: int) -> tuple:
+    async with unit_of_work() as session:
+        game = Game(name=f"{prefix} hot game", year=2025)
+        platform = Platform(name=f"{prefix} console")
+        session.add_all([game, platform])
+        await session.flush()
+        await InventoryRepository.restock(session, game.id, platform.id, stock)
+        return game.id, platform.id, platform.name
+
+
+async def stock_state(game_id: int, platform_id: int) -> StockItem:
+    async with unit_of_work() as session:
+        return await InventoryRepository.get_stock_item(session, game_id, platform_id)
+
+
+async def reserve(game_id: int, stock_data: StockChange, limiter: asyncio.Semaphore, outcomes: Counter, latencies: list):
+    async with limiter:
+        started = time.perf_counter()
+        try:
+            async with unit_of_work() as session:
+                await reserve_service(session, game_id, stock_data)
+            outcomes["reserved"] += 1
+        except HTTPException as exc:
+            outcomes[f"{exc.status_code} {exc.detail}"] += 1
+        latencies.append(time.perf_counter() - started)
+
+
+async def naive_reserve(game_id: int, platform_id: int, limiter: asyncio.Semaphore, outcomes: Counter, latencies: list):
+    # Так делать нельзя: между SELECT и UPDATE другой кассир успевает занять ту же штуку
+    async with limiter:
+        started = time.perf_counter()
+        async with unit_of_work() as session:
+            item = (await session.execute(
+                select(StockItem.quantity, StockItem.reserved)
+                .where(StockItem.game_id == game_id, StockItem.platform_id == platform_id)
+            )).one()
+            if item.quantity - item.reserved >= 1:
+                await session.execute(
+                    update(StockItem)
+                    .where(StockItem.game_id == game_id, StockItem.platform_id == platform_id)
+                    .values(reserved=item.reserved + 1)
+                )
+                outcomes["reserved"] += 1
+            else:
+                outcomes["409 out of stock"] += 1
+        latencies.append(time.perf_counter() - started)
+
+
+async def picker(batch: int, picked: list) -> None:
+    while True:
+        async with unit_of_work() as session:
+            rows = await pick_reservations_service(session, batch)
+        if not rows:
+            return
+        picked.extend(row.id for row in rows)
+
+
+def report(label: str, attempts: int, elapsed: float, outcomes: Counter, latencies: list) -> None:
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label}: {attempts} attempts in {elapsed:.2f}s -> {attempts / elapsed:.1f} req/s, "
+          f"p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+    for outcome, count in outcomes.most_common():
+        print(f"  {outcome}: {count}")
+
+
+async def run_atomic(game_id: int, platform_id: int, platform: str, attempts: int, stock: int, concurrency: int, pickers: int):
+    limiter = asyncio.Semaphore(concurrency)
+    outcomes: Counter = Counter()
+    latencies: list = []
+    stock_data = StockChange(platform=platform, quantity=1)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reserve(game_id, stock_data, limiter, outcomes, latencies) for _ in range(attempts)))
+    report("atomic reserve", attempts, time.perf_counter() - started, outcomes, latencies)
+
+    item = await stock_state(game_id, platform_id)
+    print(f"  stock: quantity {item.quantity}, reserved {item.reserved}")
+    if item.reserved != outcomes["reserved"] or item.reserved != min(attempts, stock):
+        print(f"  !! expected reserved == successful reservations == {min(attempts, stock)}")
+
+    picked: list = []
+    started = time.perf_counter()
+    await asyncio.gather(*(picker(20, picked) for _ in range(pickers)))
+    elapsed = time.perf_counter() - started
+    print(f"pick: {len(picked)} reservations by {pickers} pickers in {elapsed:.2f}s -> {len(picked) / elapsed:.1f} /s")
+
+    item = await stock_state(game_id, platform_id)
+    print(f"  stock: quantity {item.quantity}, reserved {item.reserved}")
+    if len(set(picked)) != len(picked) or len(picked) != outcomes["reserved"]:
+        print("  !! every reservation must be picked exactly once")
+    if item.reserved != 0 or item.quantity != stock - len(picked):
+        print("  !! stock does not match picked reservations")
+
+
+async def run_naive(game_id: int, platform_id: int, attempts: int, stock: int, concurrency: int):
+    async with unit_of_work() as session:
+        await session.execute(
+            update(StockItem)
+            .where(StockItem.game_id == game_id, StockItem.platform_id == platform_id)
+            .values(quantity=stock, reserved=0)
+        )
+    limiter = asyncio.Semaphore(concurrency)
+    outcomes: Counter = Counter()
+    latencies: list = []
+
+    started = time.perf_counter()
+    await asyncio.gather(*(naive_reserve(game_id, platform_id, limiter, outcomes, latencies) for _ in range(attempts)))
+    report("naive read-modify-write", attempts, time.perf_counter() - started, outcomes, latencies)
+
+    item = await stock_state(game_id, platform_id)
+    print(f"  stock: quantity {item.quantity}, reserved {item.reserved}")
+    print(f"  lost updates (oversold units): {outcomes['reserved'] - item.reserved}")
+
+
+async def main(attempts: int, stock: int, concurrency: int, pickers: int, naive: bool) -> None:
+    prefix = f"bench_{uuid.uuid4().hex[:8]}"
+    game_id, platform_id, platform = await seed(prefix, stock)
+    try:
+        await run_atomic(game_id, platform_id, platform, attempts, stock, concurrency, pickers)
+        if naive:
+            print()
+            await run_naive(game_id, platform_id, attempts, stock, concurrency)
+    finally:
+        async with unit_of_work() as session:
+            await session.execute(delete(Game).where(Game.id == game_id))
+            await session.execute(delete(Platform).where(Platform.id == platform_id))
+        await container.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--stock", type=int, default=1500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pickers", type=int, default=4)
+    parser.add_argument("--naive", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.attempts, args.stock, args.concurrency, args.pickers, args.naive))
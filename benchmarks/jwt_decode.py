@@ -0,0 +1,47 @@
+"""Пропускная способность проверки access-токена: python-jose, PyJWT и PyJWT с кэшем.
+
+Запуск: python -m benchmarks.jwt_decode [--decodes 20000] [--tokens 100]
+
+Токены перебираются по кругу, как от разных пользователей; для варианта с кэшем
+первый проход по каждому токену — промах, остальные — попадания.
+python-jose больше не в зависимостях: его строка печатается, только если пакет установлен.
+"""
+import argparse
+import time
+
+import jwt
+
+from app.auth.security import ALGORITHM, create_access_token, decode_access_token
+from app.core.config import settings
+
+
+def measure(decode, tokens, decodes: int) -> float:
+    started = time.perf_counter()
+    for i in range(decodes):
+        decode(tokens[i % len(tokens)])
+    return decodes / (time.perf_counter() - started)
+
+
+def main(decodes: int, token_count: int) -> None:
+    tokens = [create_access_token({"sub": f"user{i}"}) for i in range(token_count)]
+    secret = settings.SECRET_KEY
+    variants = {}
+    try:
+        from jose import jwt as jose_jwt
+
+        variants["python-jose"] = lambda token: jose_jwt.decode(token, secret, algorithms=[ALGORITHM])
+    except ImportError:
+        pass
+    variants["PyJWT"] = lambda token: jwt.decode(token, secret, algorithms=[ALGORITHM])
+    variants["PyJWT + cache"] = decode_access_token
+
+    for name, decode in variants.items():
+        print(f"{name:<16} {measure(decode, tokens, decodes):12.0f} decodes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--decodes", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+    main(args.decodes, args.tokens)
@@ -0,0 +1,67 @@
+"""Пропускная способность регистрации при параллельных попытках с дубликатами.
+
+Запуск (нужна база из .env с применёнными миграциями):
+    python -m benchmarks.registration [--users 200] [--duplicates 4] [--concurrency 50]
+
+Каждый пользователь регистрируется 1 + duplicates раз одновременно: ровно одна
+попытка должна пройти, остальные — получить 409 без исключений уровня БД.
+Созданные пользователи удаляются в конце.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.core.container import container
+from app.core.database import unit_of_work
+from app.users.models import User
+from app.users.schemas import UserCreate
+from app.users.service import create_user_service
+
+
+async def register(user_data: UserCreate, limiter: asyncio.Semaphore, outcomes: Counter) -> None:
+    async with limiter:
+        try:
+            async with unit_of_work() as session:
+                await create_user_service(session, user_data)
+            outcomes["created"] += 1
+        except HTTPException as exc:
+            outcomes[f"{exc.status_code} {exc.detail}"] += 1
+
+
+async def main(users: int, duplicates: int, concurrency: int) -> None:
+    prefix = f"bench_{uuid.uuid4().hex[:8]}"
+    attempts = [
+        UserCreate(email=f"{prefix}_{i}@example.com", username=f"{prefix}_{i}", password="benchmark-pass")
+        for i in range(users)
+        for _ in range(1 + duplicates)
+    ]
+    limiter = asyncio.Semaphore(concurrency)
+    outcomes: Counter = Counter()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(register(user_data, limiter, outcomes) for user_data in attempts))
+    elapsed = time.perf_counter() - started
+
+    print(f"Attempts: {len(attempts)} in {elapsed:.2f}s -> {len(attempts) / elapsed:.1f} req/s")
+    for outcome, count in outcomes.most_common():
+        print(f"  {outcome}: {count}")
+    if outcomes["created"] != users:
+        print(f"  !! expected {users} created users")
+
+    async with unit_of_work() as session:
+        await session.execute(delete(User).where(User.username.startswith(prefix)))
+    await container.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--duplicates", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.duplicates, args.concurrency))
@@ -0,0 +1,81 @@
+"""Холодный старт: время импорта модулей и время до первого ответа.
+
+Запуск: python -m benchmarks.startup [--runs 5]
+
+Каждый замер — в свежем интерпретаторе, иначе модули уже лежат в sys.modules.
+«Импорт» — сколько стоит import модуля (так платят alembic, CLI-скрипты и тесты);
+в колонке «побочные эффекты» — ресурсы контейнера, созданные уже при импорте,
+и загружен ли драйвер asyncpg. «Первый ответ» — import app.main, старт lifespan
+и GET /login (шаблон, вход не нужен) через ASGI, без сетевого сервера.
+PostgreSQL не обязательна: без неё прогрев пула падает быстро, с ней — в замер
+попадает и установка соединений.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = (
+    "app.core.config",
+    "app.core.database",
+    "app.users.models",
+    "app.auth.security",
+    "app.core.middleware",
+    "app.main",
+)
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+from app.core.container import container
+print(json.dumps({{"ms": elapsed * 1000, "created": container.created(), "asyncpg": "asyncpg" in sys.modules}}))
+"""
+
+FIRST_REQUEST_PROBE = """
+import asyncio, json, logging, time
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def first_request():
+    from benchmarks.endpoints import call
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        status = await call(app, "GET", "/login")
+        return ready, status
+
+ready, status = asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({"import": (imported - started) * 1000, "lifespan": (ready - imported) * 1000,
+                  "first": (done - started) * 1000, "status": status}))
+"""
+
+
+def probe(code: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs: int) -> None:
+    print(f"{'module':<22} {'import ms':>10}  side effects")
+    for module in MODULES:
+        samples = [probe(IMPORT_PROBE.format(module=module)) for _ in range(runs)]
+        side_effects = samples[-1]["created"] + (["asyncpg"] if samples[-1]["asyncpg"] else [])
+        print(f"{module:<22} {statistics.median(s['ms'] for s in samples):>10.1f}  {', '.join(side_effects) or '-'}")
+
+    samples = [probe(FIRST_REQUEST_PROBE) for _ in range(runs)]
+    print()
+    print(f"first request: GET /login -> {samples[-1]['status']}")
+    for key, label in (("import", "import app.main"), ("lifespan", "lifespan startup"), ("first", "time to first response")):
+        print(f"  {label:<24} {statistics.median(s[key] for s in samples):>8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.runs)
@@ -0,0 +1,59 @@
+"""Холодный старт и скорость рендеринга шаблонов: dev-режим против продакшен-режима.
+
+Запуск: python -m benchmarks.templates [--renders 2000]
+
+Холодный старт — загрузка всех шаблонов в свежее окружение, как при запуске
+воркера: без bytecode cache, с пустым кэшем (первый запуск) и с прогретым.
+База данных не нужна.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from starlette.requests import Request
+
+from app.core.templating import Templates, build_environment, precompile_templates
+from app.main import app
+
+
+def cold_start(production: bool, cache_dir: str = None) -> float:
+    _, elapsed = precompile_templates(Templates(env=build_environment(production, cache_dir)))
+    return elapsed * 1000
+
+
+def make_request() -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": [],
+        "scheme": "http", "server": ("testserver", 80), "root_path": "",
+        "app": app, "router": app.router, "state": {"user": None},
+    })
+
+
+async def render_time(production: bool, renders: int) -> float:
+    templates = Templates(env=build_environment(production, tempfile.mkdtemp()))
+    template = templates.get_template("main.html")
+    context = {"request": make_request()}
+    started = time.perf_counter()
+    for _ in range(renders):
+        if production:
+            await template.render_async(context)
+        else:
+            template.render(context)
+    return (time.perf_counter() - started) / renders * 1_000_000
+
+
+async def main(renders: int) -> None:
+    cache_dir = tempfile.mkdtemp()
+    print(f"cold start, dev (parse + compile):       {cold_start(False):8.1f} ms")
+    print(f"cold start, production, empty cache:     {cold_start(True, cache_dir):8.1f} ms")
+    print(f"cold start, production, bytecode cache:  {cold_start(True, cache_dir):8.1f} ms")
+    print(f"render main.html, sync:                  {await render_time(False, renders):8.1f} us")
+    print(f"render main.html, async:                 {await render_time(True, renders):8.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.renders))
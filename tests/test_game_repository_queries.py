@@ -0,0 +1,127 @@
+"""Число SQL-запросов методов GameRepository: возврат к N+1 должен ронять тесты.
+
+Схема поднимается в SQLite в памяти: поисковый вектор PostgreSQL заменён текстовой
+колонкой, остальные методы от диалекта не зависят. Запросы считаются по
+after_cursor_execute, поэтому учитываются и догрузки selectinload.
+
+Запуск: pip install -r requirements-dev.txt && python -m pytest -q tests
+"""
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import CollationClause
+
+from app.core.database import Base
+from app.games.models import Game, Platform
+from app.games.repository import GameRepository
+
+GAMES = 30
+PLATFORMS = ("PC", "PS5", "Switch")
+
+
+@compiles(TSVECTOR, "sqlite")
+def compile_tsvector(element, compiler, **kw):
+    return "TEXT"
+
+
+@compiles(CollationClause, "sqlite")
+def compile_collation(element, compiler, **kw):
+    # Collation "C" PostgreSQL — побайтовое сравнение, в SQLite это BINARY
+    return "BINARY" if element.collation == "C" else compiler.visit_collation(element, **kw)
+
+
+def register_postgres_functions(dbapi_connection, _):
+    # Выражение search_vector вызывает функции PostgreSQL — в SQLite хватает заглушек
+    dbapi_connection.create_function("to_tsvector", 2, lambda config, value: value, deterministic=True)
+    dbapi_connection.create_function("setweight", 2, lambda vector, weight: vector, deterministic=True)
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "after_cursor_execute", self._record)
+
+    def _record(self, *args) -> None:
+        self.count += 1
+
+    @contextmanager
+    def expect(self, expected: int):
+        started = self.count
+        yield
+        assert self.count - started == expected
+
+
+@pytest.fixture
+def database():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    event.listen(engine.sync_engine, "connect", register_postgres_functions)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all, tables=[
+                Base.metadata.tables[name] for name in ("games", "platforms", "game_platform")
+            ])
+        async with session_factory() as session:
+            platforms = [Platform(name=name) for name in PLATFORMS]
+            session.add_all(platforms)
+            for number in range(GAMES):
+                session.add(Game(name=f"Game {number:02d}", year=2000 + number % 5, platforms=platforms[:number % 3 + 1]))
+            await session.commit()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(setup())
+    yield loop, session_factory, StatementCounter(engine)
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+def run(database, method):
+    loop, session_factory, counter = database
+
+    async def call():
+        async with session_factory() as session:
+            return await method(session)
+
+    return loop.run_until_complete(call())
+
+
+@pytest.mark.parametrize("method, expected", [
+    # Игра + один selectin по платформам
+    (lambda session: GameRepository.get_game_by_id(session, 1), 2),
+    (lambda session: GameRepository.get_game_by_id(session, 1, with_platforms=False), 1),
+    (lambda session: GameRepository.get_game_by_name(session, "Game 05"), 1),
+    (lambda session: GameRepository.get_game_by_name(session, "Game 05", with_platforms=True), 2),
+    (lambda session: GameRepository.get_all_games(session, summary=True), 1),
+    # Платформы всех игр — один запрос, а не по запросу на игру
+    (lambda session: GameRepository.get_all_games(session, with_platforms=True), 2),
+    (lambda session: GameRepository.get_platform_ids(session, list(range(1, GAMES + 1))), 1),
+    (lambda session: GameRepository.get_platform_ids(session, []), 0),
+    (lambda session: GameRepository.list_games(session, limit=21), 2),
+    (lambda session: GameRepository.list_games(session, limit=21, after=("Game 10", 2000, 11), platform="PS5"), 2),
+    (lambda session: GameRepository.get_games_fingerprint(session), 1),
+    (lambda session: GameRepository.get_game_ids(session), 1),
+])
+def test_statement_count(database, method, expected):
+    _, _, counter = database
+    with counter.expect(expected):
+        run(database, method)
+
+
+def test_platforms_do_not_lazy_load(database):
+    games = run(database, lambda session: GameRepository.get_all_games(session, with_platforms=True))
+    _, _, counter = database
+    with counter.expect(0):
+        names = {platform.name for game in games for platform in game.platforms}
+    assert names == set(PLATFORMS)
+
+
+def test_game_by_name_filters_year(database):
+    # Уникальна пара (name, year): одноимённая игра другого года — не дубликат
+    assert run(database, lambda session: GameRepository.get_game_by_name(session, "Game 05", year=2000)).id == 6
+    assert run(database, lambda session: GameRepository.get_game_by_name(session, "Game 05", year=2001)) is None
@@ -0,0 +1,76 @@
+"""Шаблоны рендерятся внутри обработчика, пока сессия get_session ещё открыта.
+
+Запуск: pip install -r requirements-dev.txt && python -m pytest -q tests
+"""
+import asyncio
+import threading
+
+import pytest
+from jinja2 import DictLoader, Environment
+from starlette.requests import Request
+
+from app.core.templating import Templates
+
+TEMPLATES = {"profile.html": "<p>{{ user.name }}</p>"}
+
+
+class DetachedUser:
+    """Как ORM-объект с lazy="raise": после закрытия сессии атрибут недоступен."""
+
+    def __init__(self):
+        self.closed = False
+        self.render_threads = set()
+
+    @property
+    def name(self) -> str:
+        if self.closed:
+            raise RuntimeError("session is closed")
+        self.render_threads.add(threading.get_ident())
+        return "Alice"
+
+
+def make_templates(is_async: bool) -> Templates:
+    return Templates(env=Environment(loader=DictLoader(TEMPLATES), autoescape=True, enable_async=is_async))
+
+
+async def send_response(response) -> bytes:
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await response(scope, receive, send)
+    return b"".join(chunks)
+
+
+@pytest.mark.parametrize("is_async", [True, False])
+def test_rendered_before_handler_returns(is_async):
+    user = DetachedUser()
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+    async def handler():
+        # unit_of_work закрывает сессию сразу после выхода из обработчика
+        response = await make_templates(is_async).TemplateResponse(
+            "profile.html", {"request": request, "user": user}
+        )
+        user.closed = True
+        return await send_response(response)
+
+    assert asyncio.run(handler()) == b"<p>Alice</p>"
+
+
+def test_sync_environment_renders_off_the_loop():
+    user = DetachedUser()
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+    async def handler():
+        await make_templates(False).TemplateResponse("profile.html", {"request": request, "user": user})
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(handler())
+    assert user.render_threads and loop_thread not in user.render_threads